@@ -1,15 +1,44 @@
+from typing import List, Optional
+
+# Positions with both coordinates in [-CACHE_RADIUS, CACHE_RADIUS) are interned
+CACHE_RADIUS = 64
+CACHE_SIDE = 2 * CACHE_RADIUS
+
+
 class Pos:
     """
     # represents a position in R2
     # -y is up, +y is down
     # +x is right, -x is left
+    # Positions are immutable. Positions near the origin are interned, so building one there does not allocate.
     """
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-    
+    __slots__ = ("x", "y", "_hash")
+
+    def __new__(cls, x: int, y: int) -> "Pos":
+        if -CACHE_RADIUS <= x < CACHE_RADIUS and -CACHE_RADIUS <= y < CACHE_RADIUS:
+            index = (x + CACHE_RADIUS) * CACHE_SIDE + y + CACHE_RADIUS
+            pos = _cache[index]
+            if pos is None:
+                pos = _cache[index] = Pos.__create(x, y)
+            return pos
+        return Pos.__create(x, y)
+
+    @staticmethod
+    def __create(x: int, y: int) -> "Pos":
+        pos = object.__new__(Pos)
+        object.__setattr__(pos, "x", x)
+        object.__setattr__(pos, "y", y)
+        object.__setattr__(pos, "_hash", hash((x, y)))
+        return pos
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Pos is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Pos is immutable")
+
     def __eq__(self, other):
-        return isinstance(other, self.__class__)\
+        return self is other or isinstance(other, Pos)\
           and self.x == other.x\
           and self.y == other.y
 
@@ -17,7 +46,19 @@ class Pos:
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
+
+    def __reduce__(self):
+        return Pos, (self.x, self.y)
+
+    def __copy__(self) -> "Pos":
+        return self
+
+    def __deepcopy__(self, memo) -> "Pos":
+        return self
 
     def __repr__(self) -> str:
         return f"Pos({self.x},{self.y})"
+
+
+_cache: List[Optional[Pos]] = [None] * (CACHE_SIDE * CACHE_SIDE)
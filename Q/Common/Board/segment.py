@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterator, Optional, Tuple
+
+from .pos import Pos
+from .tile import Tile, NUM_OF_KINDS
+from .tile_color import TileColor
+from .tile_shape import TileShape
+
+
+class Axis(Enum):
+    """
+    # The two directions a contiguous line of tiles can run in
+    # A row varies in x at a fixed y, a col varies in y at a fixed x
+    """
+    ROW = "row"
+    COL = "col"
+
+
+@dataclass(frozen=True)
+class Segment:
+    """
+    # Represents a maximal contiguous run of tiles in a row or a col of the board
+    # line: the fixed coordinate of the run (y for a row, x for a col)
+    # start, end: the inclusive range of the varying coordinate
+    # shape_counts, color_counts: how many tiles of each shape/color the run holds, indexed by enum value - 1
+    """
+    axis: Axis
+    line: int
+    start: int
+    end: int
+    shape_counts: Tuple[int, ...]
+    color_counts: Tuple[int, ...]
+
+    @staticmethod
+    def of_tile(axis: Axis, pos: Pos, tile: Tile) -> "Segment":
+        """
+        Creates the segment made of a single tile
+        """
+        line, coordinate = (pos.y, pos.x) if axis is Axis.ROW else (pos.x, pos.y)
+        shape_counts, color_counts = TILE_COUNTS[tile.code()]
+        return Segment(axis, line, coordinate, coordinate, shape_counts, color_counts)
+
+    def join(self, other: Optional["Segment"]) -> "Segment":
+        """
+        Joins this segment with an adjacent segment of the same line
+        :param other: the segment touching this one, or None
+        :return: the segment covering both
+        """
+        if other is None:
+            return self
+        return Segment(self.axis, self.line, min(self.start, other.start), max(self.end, other.end),
+                       tuple(a + b for a, b in zip(self.shape_counts, other.shape_counts)),
+                       tuple(a + b for a, b in zip(self.color_counts, other.color_counts)))
+
+    def recount(self, removed: Tile, added: Tile) -> "Segment":
+        """
+        Updates the counts of the segment when one of its tiles is swapped for another
+        :return: the recounted segment
+        """
+        shape_counts = tuple(count - (shape is removed.shape) + (shape is added.shape)
+                             for shape, count in zip(TileShape, self.shape_counts))
+        color_counts = tuple(count - (color is removed.color) + (color is added.color)
+                             for color, count in zip(TileColor, self.color_counts))
+        return Segment(self.axis, self.line, self.start, self.end, shape_counts, color_counts)
+
+    def __len__(self) -> int:
+        return self.end - self.start + 1
+
+    def num_of_shapes(self) -> int:
+        """
+        :return: the number of distinct shapes in the segment
+        """
+        return sum(1 for count in self.shape_counts if count)
+
+    def num_of_colors(self) -> int:
+        """
+        :return: the number of distinct colors in the segment
+        """
+        return sum(1 for count in self.color_counts if count)
+
+    def pos_at(self, coordinate: int) -> Pos:
+        """
+        :return: the position on this segment's line at the given varying coordinate
+        """
+        return Pos(coordinate, self.line) if self.axis is Axis.ROW else Pos(self.line, coordinate)
+
+    def positions(self) -> Iterator[Pos]:
+        """
+        Iterates over the positions of the segment from start to end
+        """
+        for coordinate in range(self.start, self.end + 1):
+            yield self.pos_at(coordinate)
+
+
+# The shape and color counts of a segment made of a single tile, indexed by the tile's code
+TILE_COUNTS = [(tuple(int(shape is tile.shape) for shape in TileShape),
+                tuple(int(color is tile.color) for color in TileColor))
+               for tile in map(Tile.from_code, range(NUM_OF_KINDS))]
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+from .tile import Tile, NUM_OF_KINDS
+from .tile_color import TileColor
+from .tile_shape import TileShape
+
+ALL_SHAPES = frozenset(TileShape)
+ALL_COLORS = frozenset(TileColor)
+# Bitmasks over tile codes: bit c is set when the tile with code c has the given shape/color
+SHAPE_MASKS = {shape: sum(1 << code for code in range(NUM_OF_KINDS) if Tile.from_code(code).shape is shape)
+               for shape in TileShape}
+COLOR_MASKS = {color: sum(1 << code for code in range(NUM_OF_KINDS) if Tile.from_code(code).color is color)
+               for color in TileColor}
+
+
+@dataclass(frozen=True)
+class SlotConstraint:
+    """
+    # Summarizes what an empty slot on the frontier of the board requires of a tile placed there.
+    # On each axis a tile fits if it shares its shape with every neighbor on that axis (its shape is in the
+    # allowed shapes) or it shares its color with every neighbor on that axis (its color is in the allowed colors).
+    # The row axis is made of the left and right neighbors, the col axis of the above and below neighbors.
+    # codes is the bitmask of the tile codes accepted on both axes.
+    """
+    row_shapes: FrozenSet[TileShape]
+    row_colors: FrozenSet[TileColor]
+    col_shapes: FrozenSet[TileShape]
+    col_colors: FrozenSet[TileColor]
+    codes: int
+
+    @staticmethod
+    def from_neighbors(above: Optional[Tile], below: Optional[Tile], left: Optional[Tile],
+                       right: Optional[Tile]) -> "SlotConstraint":
+        """
+        Builds the constraint of a slot from its immediate neighbors
+        :return: the constraint summarizing both axes
+        """
+        row_shapes, row_colors = SlotConstraint.__summarize_axis(left, right)
+        col_shapes, col_colors = SlotConstraint.__summarize_axis(above, below)
+        codes = SlotConstraint.__axis_codes(row_shapes, row_colors) & SlotConstraint.__axis_codes(col_shapes, col_colors)
+        return SlotConstraint(row_shapes, row_colors, col_shapes, col_colors, codes)
+
+    @staticmethod
+    def __summarize_axis(tile1: Optional[Tile], tile2: Optional[Tile]):
+        """
+        Computes the shapes and colors allowed on an axis with the given neighbors
+        :return: a pair of the allowed shapes and the allowed colors
+        """
+        shapes = ALL_SHAPES
+        colors = ALL_COLORS
+        for tile in (tile1, tile2):
+            if tile is not None:
+                shapes = shapes & {tile.shape}
+                colors = colors & {tile.color}
+        return shapes, colors
+
+    @staticmethod
+    def __axis_codes(shapes: FrozenSet[TileShape], colors: FrozenSet[TileColor]) -> int:
+        """
+        :return: the bitmask of tile codes having one of the given shapes or one of the given colors
+        """
+        codes = 0
+        for shape in shapes:
+            codes |= SHAPE_MASKS[shape]
+        for color in colors:
+            codes |= COLOR_MASKS[color]
+        return codes
+
+    def accepts(self, tile: Tile) -> bool:
+        """
+        Can the given tile be placed in this slot according to its neighbors?
+        :param tile: the tile that would be placed
+        :return: true if the tile fits on both axes
+        """
+        return (self.codes >> tile.code()) & 1 == 1
@@ -0,0 +1,145 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from .pos import Pos
+from .tile import Tile
+from .tile_color import TileColor
+from .tile_shape import TileShape
+from .zobrist import Zobrist
+
+# The 8 rotations and reflections of the square, each as the matrix (a, b, c, d) mapping (x, y) to
+# (a * x + b * y, c * x + d * y)
+TRANSFORMS = [(1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0),
+              (-1, 0, 0, 1), (1, 0, 0, -1), (0, 1, 1, 0), (0, -1, -1, 0)]
+IDENTITY_LABELS = tuple(range(len(TileShape)))
+NUM_OF_COLORS = len(TileColor)
+
+
+@dataclass(frozen=True)
+class Symmetry:
+    """
+    # Represents a symmetry of the game: a rotation or reflection of the board followed by a translation, and a
+    # relabeling of the shapes and the colors. Legality and scoring only compare positions along rows and cols and
+    # count distinct shapes and colors, so they are the same for a position and its image under any symmetry.
+    # transform: the matrix of the rotation or reflection, see TRANSFORMS
+    # offset: the translation subtracted after the transform
+    # shapes, colors: the new index of each shape and color index (enum value - 1)
+    """
+    transform: Tuple[int, int, int, int] = TRANSFORMS[0]
+    offset: Tuple[int, int] = (0, 0)
+    shapes: Tuple[int, ...] = IDENTITY_LABELS
+    colors: Tuple[int, ...] = IDENTITY_LABELS
+
+    def apply_pos(self, pos: Pos) -> Pos:
+        """
+        :return: the image of the position in the canonical frame
+        """
+        a, b, c, d = self.transform
+        return Pos(a * pos.x + b * pos.y - self.offset[0], c * pos.x + d * pos.y - self.offset[1])
+
+    def invert_pos(self, pos: Pos) -> Pos:
+        """
+        :return: the position whose image is the given position of the canonical frame
+        """
+        a, b, c, d = self.transform
+        x, y = pos.x + self.offset[0], pos.y + self.offset[1]
+        return Pos(a * x + c * y, b * x + d * y)
+
+    def apply_tile(self, tile: Tile) -> Tile:
+        """
+        :return: the tile with its shape and color relabeled
+        """
+        shape, color = divmod(tile.code(), NUM_OF_COLORS)
+        return Tile.from_code(self.shapes[shape] * NUM_OF_COLORS + self.colors[color])
+
+    def invert_tile(self, tile: Tile) -> Tile:
+        """
+        :return: the tile whose relabeling is the given tile
+        """
+        shape, color = divmod(tile.code(), NUM_OF_COLORS)
+        return Tile.from_code(self.shapes.index(shape) * NUM_OF_COLORS + self.colors.index(color))
+
+    def apply_placements(self, placements: Mapping[Pos, Tile]) -> Dict[Pos, Tile]:
+        """
+        :return: the images of the placements, in the same order
+        """
+        return {self.apply_pos(pos): self.apply_tile(tile) for pos, tile in placements.items()}
+
+    def invert_placements(self, placements: Mapping[Pos, Tile]) -> Dict[Pos, Tile]:
+        """
+        :return: the placements whose images are the given placements, in the same order
+        """
+        return {self.invert_pos(pos): self.invert_tile(tile) for pos, tile in placements.items()}
+
+    @staticmethod
+    def canonicalize(tiles: Mapping[Pos, Tile], hand: Iterable[Tile] = (), relabel: bool = False) \
+            -> Tuple[int, "Symmetry"]:
+        """
+        Finds a canonical form of a board and a hand, so that positions that are images of each other under
+        symmetries share it. Each of the 8 transforms is tried: the transformed board is moved so its smallest x
+        and y are 0 and its tiles are listed in row order, relabeling shapes and colors in order of first
+        appearance if asked, and the smallest listing wins, then the smallest relabeled hand. Hand tiles whose shape or color is not on the board are
+        labeled after the board's by how common they are in the hand, so some hands differing only in such labels
+        may not be recognized as equal, but positions with the same key are always equivalent.
+        Takes time proportional to n log n for a board of n tiles.
+        :param tiles: the tiles of the board, e.g. Map.tiles
+        :param hand: the tiles of the hand
+        :param relabel: whether shapes and colors may be relabeled
+        :return: a 64-bit key of the canonical form, and the symmetry taking the position to it
+        """
+        hand = list(hand)
+        best = None
+        for transform in TRANSFORMS if tiles else TRANSFORMS[:1]:
+            a, b, c, d = transform
+            cells = [(c * pos.x + d * pos.y, a * pos.x + b * pos.y, tile.code()) for pos, tile in tiles.items()]
+            offset_x = min((x for _, x, _ in cells), default=0)
+            offset_y = min((y for y, _, _ in cells), default=0)
+            cells.sort()
+            shapes, colors = Symmetry.__get_labels([code for _, _, code in cells], hand, relabel)
+            symmetry = Symmetry(transform, (offset_x, offset_y), shapes, colors)
+            listing = [(y - offset_y, x - offset_x, shapes[code // NUM_OF_COLORS] * NUM_OF_COLORS
+                        + colors[code % NUM_OF_COLORS]) for y, x, code in cells]
+            hand_listing = sorted(symmetry.apply_tile(tile).code() for tile in hand)
+            if best is None or (listing, hand_listing) < best[:2]:
+                best = (listing, hand_listing, symmetry)
+
+        listing, hand_listing, symmetry = best
+        data = bytearray()
+        for y, x, code in listing:
+            data += y.to_bytes(2, "little", signed=True) + x.to_bytes(2, "little", signed=True) + bytes([code])
+        data += bytes([0xFF]) + bytes(hand_listing)
+        return Zobrist.digest(bytes(data)), symmetry
+
+    @staticmethod
+    def __get_labels(codes: List[int], hand: List[Tile], relabel: bool) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Labels the shapes and the colors in order of first appearance on the board, then in the hand, then the
+        ones that appear nowhere. Hand tiles are labeled one at a time, the one with the most labels known first,
+        then the one whose shape, color and kind are most common in the hand.
+        :param codes: the codes of the board's tiles in listing order
+        :return: the new index of each shape index and of each color index
+        """
+        if not relabel:
+            return IDENTITY_LABELS, IDENTITY_LABELS
+        shapes: Dict[int, int] = {}
+        colors: Dict[int, int] = {}
+        for code in codes:
+            shapes.setdefault(code // NUM_OF_COLORS, len(shapes))
+            colors.setdefault(code % NUM_OF_COLORS, len(colors))
+        unlabeled = len(IDENTITY_LABELS)
+        remaining = sorted(divmod(tile.code(), NUM_OF_COLORS) for tile in hand)
+        shape_counts = Counter(shape for shape, _ in remaining)
+        color_counts = Counter(color for _, color in remaining)
+        tile_counts = Counter(remaining)
+        while remaining:
+            shape, color = min(remaining, key=lambda kind: (
+                shapes.get(kind[0], unlabeled), colors.get(kind[1], unlabeled),
+                -shape_counts[kind[0]], -color_counts[kind[1]], -tile_counts[kind]))
+            shapes.setdefault(shape, len(shapes))
+            colors.setdefault(color, len(colors))
+            remaining.remove((shape, color))
+        for label in IDENTITY_LABELS:
+            shapes.setdefault(label, len(shapes))
+            colors.setdefault(label, len(colors))
+        return tuple(shapes[label] for label in IDENTITY_LABELS), tuple(colors[label] for label in IDENTITY_LABELS)
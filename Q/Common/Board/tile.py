@@ -1,15 +1,35 @@
+from typing import Dict, List, Tuple
+
 from .tile_color import TileColor
 from .tile_shape import TileShape
 
+NUM_OF_KINDS = len(TileShape) * len(TileColor)
+
 
 class Tile:
     """
     # Represents a tile on the board of the Q Game
+    # Tiles are immutable flyweights: there is exactly one Tile per (shape, color), so building a tile never
+    # allocates and copying one returns it unchanged.
     """
-    def __init__(self, shape: TileShape, color: TileColor):
-        self.shape = shape
-        self.color = color
-    
+    __slots__ = ("shape", "color", "_code")
+
+    def __new__(cls, shape: TileShape, color: TileColor) -> "Tile":
+        tile = _interned.get((shape, color))
+        if tile is None:
+            tile = object.__new__(Tile)
+            object.__setattr__(tile, "shape", shape)
+            object.__setattr__(tile, "color", color)
+            object.__setattr__(tile, "_code", (shape.value - 1) * len(TileColor) + (color.value - 1))
+            _interned[(shape, color)] = tile
+        return tile
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Tile is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Tile is immutable")
+
     def compatible_shape(self, other: "Tile") -> bool:
         """
         is the other tile of matching shape with this tile?
@@ -17,7 +37,7 @@ class Tile:
         :return: if the tile is matching shape.
         """
         return self.shape is other.shape
-    
+
     def compatible_color(self, other: "Tile") -> bool:
         """
         is the other tile of matching color with this tile?
@@ -25,11 +45,43 @@ class Tile:
         :return: if the tile is matching color.
         """
         return self.color is other.color
-    
+
+    def code(self) -> int:
+        """
+        The small integer code of this tile's kind: shape index * 6 + color index, in the range [0, 36)
+        :return: the code of the tile
+        """
+        return self._code
+
+    @staticmethod
+    def from_code(code: int) -> "Tile":
+        """
+        Gets the tile whose kind has the given code
+        :param code: a code produced by Tile.code
+        :return: the tile of that kind
+        """
+        return _by_code[code]
+
+    def __reduce__(self):
+        return Tile, (self.shape, self.color)
+
+    def __copy__(self) -> "Tile":
+        return self
+
+    def __deepcopy__(self, memo) -> "Tile":
+        return self
+
     def __repr__(self) -> str:
         return f"Tile({self.shape}, {self.color})"
-    
+
     def __eq__(self, other) -> bool:
-        return isinstance(other, self.__class__)\
+        return self is other or isinstance(other, Tile)\
           and self.shape is other.shape\
           and self.color is other.color
+
+    def __hash__(self) -> int:
+        return self._code
+
+
+_interned: Dict[Tuple[TileShape, TileColor], Tile] = {}
+_by_code: List[Tile] = [Tile(shape, color) for shape in TileShape for color in TileColor]
@@ -0,0 +1,156 @@
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Tuple
+
+from .pos import Pos
+from .tile import Tile, NUM_OF_KINDS
+
+EMPTY = 0xFF
+INITIAL_SIDE = 16
+# The flyweight tile of each code, so that reads are a list index
+TILES_BY_CODE = [Tile.from_code(code) for code in range(NUM_OF_KINDS)]
+
+
+class TileGrid(MutableMapping):
+    """
+    # A dense, growable 2D array of tile codes that behaves like a Dict[Pos, Tile]
+    # Cell (0, 0) of the array holds the board position (origin_x, origin_y). The array doubles in the
+    # direction it overflows, so the origin moves as tiles are placed up and to the left of it.
+    """
+    def __init__(self, config: Dict[Pos, Tile] = None):
+        """
+        :param config: tiles to start the grid with
+        """
+        self.origin_x = -(INITIAL_SIDE // 2)
+        self.origin_y = -(INITIAL_SIDE // 2)
+        self.width = INITIAL_SIDE
+        self.height = INITIAL_SIDE
+        self.cells = bytearray([EMPTY]) * (self.width * self.height)
+        self.count = 0
+        if config:
+            for pos, tile in config.items():
+                self[pos] = tile
+
+    def code_at(self, x: int, y: int) -> int:
+        """
+        Gets the code of the tile at the given board coordinates
+        :return: the tile code, or EMPTY if there is no tile there
+        """
+        col = x - self.origin_x
+        row = y - self.origin_y
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self.cells[row * self.width + col]
+        return EMPTY
+
+    def tile_at(self, x: int, y: int) -> Optional[Tile]:
+        """
+        Gets the tile at the given board coordinates
+        :return: the tile, or None if there is no tile there
+        """
+        code = self.code_at(x, y)
+        return None if code == EMPTY else TILES_BY_CODE[code]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """
+        :return: the board coordinates (min_x, min_y, max_x, max_y) covered by the underlying array
+        """
+        return self.origin_x, self.origin_y, self.origin_x + self.width - 1, self.origin_y + self.height - 1
+
+    def get(self, pos: Pos, default=None):
+        code = self.code_at(pos.x, pos.y)
+        return default if code == EMPTY else TILES_BY_CODE[code]
+
+    def items(self) -> Iterator[Tuple[Pos, Tile]]:
+        """
+        Iterates over the occupied positions and their tiles in row-major order
+        """
+        width = self.width
+        for index, code in enumerate(self.cells):
+            if code != EMPTY:
+                row, col = divmod(index, width)
+                yield Pos(col + self.origin_x, row + self.origin_y), TILES_BY_CODE[code]
+
+    def copy(self) -> "TileGrid":
+        """
+        :return: a grid holding the same tiles that can be changed independently of this one
+        """
+        grid = TileGrid()
+        grid.origin_x, grid.origin_y = self.origin_x, self.origin_y
+        grid.width, grid.height = self.width, self.height
+        grid.cells = bytearray(self.cells)
+        grid.count = self.count
+        return grid
+
+    def __getitem__(self, pos: Pos) -> Tile:
+        code = self.code_at(pos.x, pos.y)
+        if code == EMPTY:
+            raise KeyError(pos)
+        return TILES_BY_CODE[code]
+
+    def __setitem__(self, pos: Pos, tile: Tile):
+        self.__grow_to(pos.x, pos.y)
+        index = (pos.y - self.origin_y) * self.width + (pos.x - self.origin_x)
+        if self.cells[index] == EMPTY:
+            self.count += 1
+        self.cells[index] = tile.code()
+
+    def __delitem__(self, pos: Pos):
+        if self.code_at(pos.x, pos.y) == EMPTY:
+            raise KeyError(pos)
+        self.cells[(pos.y - self.origin_y) * self.width + (pos.x - self.origin_x)] = EMPTY
+        self.count -= 1
+
+    def __contains__(self, pos) -> bool:
+        return isinstance(pos, Pos) and self.code_at(pos.x, pos.y) != EMPTY
+
+    def __iter__(self) -> Iterator[Pos]:
+        """
+        Iterates over the occupied positions in row-major order
+        """
+        width = self.width
+        for index, code in enumerate(self.cells):
+            if code != EMPTY:
+                row, col = divmod(index, width)
+                yield Pos(col + self.origin_x, row + self.origin_y)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"TileGrid({dict(self.items())})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (TileGrid, dict)):
+            return NotImplemented
+        return len(self) == len(other) and all(other.get(pos) == tile for pos, tile in self.items())
+
+    def __grow_to(self, x: int, y: int):
+        """
+        Reallocates the array so that it covers the given coordinates, at least doubling the overflowing side
+        """
+        min_x, min_y, max_x, max_y = self.bounds()
+        if min_x <= x <= max_x and min_y <= y <= max_y:
+            return
+        new_min_x, new_max_x = min_x, max_x
+        new_min_y, new_max_y = min_y, max_y
+        if x < min_x:
+            new_min_x = min(x, min_x - self.width)
+        elif x > max_x:
+            new_max_x = max(x, max_x + self.width)
+        if y < min_y:
+            new_min_y = min(y, min_y - self.height)
+        elif y > max_y:
+            new_max_y = max(y, max_y + self.height)
+
+        new_width = new_max_x - new_min_x + 1
+        new_height = new_max_y - new_min_y + 1
+        new_cells = bytearray([EMPTY]) * (new_width * new_height)
+        col_offset = min_x - new_min_x
+        for row in range(self.height):
+            start = (row + min_y - new_min_y) * new_width + col_offset
+            new_cells[start:start + self.width] = self.cells[row * self.width:(row + 1) * self.width]
+
+        self.cells = new_cells
+        self.width = new_width
+        self.height = new_height
+        self.origin_x = new_min_x
+        self.origin_y = new_min_y
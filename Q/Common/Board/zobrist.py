@@ -0,0 +1,40 @@
+from hashlib import blake2b
+
+from .pos import Pos
+from .tile import Tile
+
+MASK_64 = (1 << 64) - 1
+COORDINATE_MASK = (1 << 24) - 1
+
+
+class Zobrist:
+    """
+    # 64-bit Zobrist keys used to identify boards and game states
+    # The key of a tile at a position is derived from the position and the tile code with the splitmix64 mixer
+    # rather than drawn from a random table, so keys exist for every position of the unbounded board and are the
+    # same in every process.
+    """
+    @staticmethod
+    def mix(value: int) -> int:
+        """
+        Scrambles a 64-bit value with the splitmix64 finalizer
+        :return: the scrambled 64-bit value
+        """
+        value = (value + 0x9E3779B97F4A7C15) & MASK_64
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+        return value ^ (value >> 31)
+
+    @staticmethod
+    def tile_key(pos: Pos, tile: Tile) -> int:
+        """
+        :return: the key of the given tile placed at the given position
+        """
+        return Zobrist.mix(((pos.x & COORDINATE_MASK) << 40) | ((pos.y & COORDINATE_MASK) << 16) | tile.code())
+
+    @staticmethod
+    def digest(data: bytes) -> int:
+        """
+        :return: a 64-bit hash of the given bytes, stable across processes
+        """
+        return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
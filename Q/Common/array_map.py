@@ -0,0 +1,96 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.tile_grid import TileGrid, EMPTY
+from Q.Common.map import Map
+
+
+class ArrayMap(Map):
+    """
+    A Map whose tiles are kept in a dense TileGrid of small integer codes instead of a dictionary of Pos to Tile.
+    Neighbor and contiguous-line lookups index the array directly rather than hashing freshly built positions.
+    """
+
+    def create_tiles(self, config: Dict[Pos, Tile] = None) -> TileGrid:
+        """
+        Stores the tiles in a TileGrid. The given config is copied into the grid.
+        """
+        return TileGrid(config)
+
+    def get_number_of_tile_neighbors(self, pos: Pos) -> int:
+        code_at = self.tiles.code_at
+        x, y = pos.x, pos.y
+        return (code_at(x, y + 1) != EMPTY) + (code_at(x, y - 1) != EMPTY) \
+            + (code_at(x - 1, y) != EMPTY) + (code_at(x + 1, y) != EMPTY)
+
+    def get_neighbors(self, pos: Pos) -> Dict[Pos, Tile]:
+        """
+        gets the immediate neighbors of a given position (up, down, left, right)
+        :param pos: the position of on the map of whose neighbors you get from.
+        :return: a dictionary of positions to tiles
+        """
+        tile_at = self.tiles.tile_at
+        x, y = pos.x, pos.y
+        return {
+            Pos(x, y + 1): tile_at(x, y + 1),
+            Pos(x, y - 1): tile_at(x, y - 1),
+            Pos(x - 1, y): tile_at(x - 1, y),
+            Pos(x + 1, y): tile_at(x + 1, y)
+        }
+
+    def get_neighbor_tiles(self, pos: Pos) -> Tuple[Optional[Tile], Optional[Tile], Optional[Tile], Optional[Tile]]:
+        tile_at = self.tiles.tile_at
+        x, y = pos.x, pos.y
+        return tile_at(x, y + 1), tile_at(x, y - 1), tile_at(x - 1, y), tile_at(x + 1, y)
+
+    def get_contiguous(self, direction: Callable[[Pos], Pos], pos: Pos) -> List[Pos]:
+        """
+        Gets all positions in contiguous direction
+        Note: Not including the initial position.
+        :param pos: position of the starting pos
+        :param direction: a function that returns a new pos in some direction, e.g. PosFuncs.left
+        :return: List of positions in contiguous row
+        """
+        step = direction(Pos(0, 0))
+        return [Pos(x, y) for x, y in self.__walk(pos.x, pos.y, step.x, step.y)]
+
+    def get_contiguous_row(self, pos: Pos) -> Set[Pos]:
+        """
+        Gets the contiguous row for the given position
+        :param pos: Position to find contiguous row for
+        :return: List of positions in contiguous row
+        """
+        return self.__get_contiguous_line(pos, 1, 0)
+
+    def get_contiguous_col(self, pos: Pos) -> Set[Pos]:
+        """
+        Gets the contiguous col for the given position
+        :param pos: Position to find contiguous col for
+        :return: List of positions in contiguous col
+        """
+        return self.__get_contiguous_line(pos, 0, -1)
+
+    def __get_contiguous_line(self, pos: Pos, dx: int, dy: int) -> Set[Pos]:
+        """
+        Builds the contiguous line through pos, walking towards (-dx, -dy) first and then towards (dx, dy) so that
+        positions are inserted in the same order as Map.get_contiguous_row (left first) and
+        Map.get_contiguous_col (above first)
+        """
+        positions = {Pos(x, y) for x, y in self.__walk(pos.x, pos.y, -dx, -dy)}
+        positions.add(pos)
+        positions.update(Pos(x, y) for x, y in self.__walk(pos.x, pos.y, dx, dy))
+        return positions
+
+    def __walk(self, x: int, y: int, dx: int, dy: int) -> List[tuple]:
+        """
+        Walks from (x, y) in steps of (dx, dy) until an empty cell, not including the starting cell
+        :return: the coordinates of the occupied cells walked over
+        """
+        code_at = self.tiles.code_at
+        coordinates = []
+        x, y = x + dx, y + dy
+        while code_at(x, y) != EMPTY:
+            coordinates.append((x, y))
+            x, y = x + dx, y + dy
+        return coordinates
@@ -0,0 +1,104 @@
+import random
+from typing import Iterable, Iterator, List, Union
+
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.tile_color import TileColor
+from Q.Common.Board.tile_shape import TileShape
+
+# The head is compacted away once it holds this many drawn codes and more than half of the buffer
+COMPACT_THRESHOLD = 256
+
+
+class Deck:
+    """
+    Represents the referee's bag of tiles, top first. Tiles are kept as their one byte codes in a bytearray with
+    the index of the top, so drawing k tiles takes time proportional to k: it copies them out and moves the top
+    instead of shifting the rest of the bag. Returned tiles go to the bottom. The drawn codes before the top are
+    dropped once they outnumber the tiles left, which keeps both operations amortized constant time per tile.
+    It reads like a list of tiles: it has a length, iterates and indexes from the top and can be extended.
+    """
+    __slots__ = ("__codes", "__head")
+
+    def __init__(self, tiles: Iterable[Tile] = ()):
+        """
+        :param tiles: the tiles of the deck, top first
+        """
+        self.__codes = bytearray(tile.code() for tile in tiles)
+        self.__head = 0
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "Deck":
+        """
+        Builds a deck from tile codes, as written by to_bytes
+        """
+        deck = Deck()
+        deck.__codes = bytearray(data)
+        return deck
+
+    def to_bytes(self) -> bytes:
+        """
+        :return: the codes of the tiles, top first
+        """
+        return bytes(self.__codes[self.__head:])
+
+    @staticmethod
+    def shuffled(counts: int, size: int, rng: random.Random) -> "Deck":
+        """
+        Builds a shuffled deck from counts tiles of every kind, listed by color then shape before the shuffle
+        :param counts: the number of tiles of each kind
+        :param size: the number of tiles kept from the top of the shuffled deck
+        :param rng: the random number generator of the shuffle
+        :return: the deck
+        """
+        codes = bytearray(Tile(shape, color).code() for color in TileColor for shape in TileShape
+                          for _ in range(counts))
+        rng.shuffle(codes)
+        return Deck.from_bytes(codes[:size])
+
+    def draw(self, n: int) -> List[Tile]:
+        """
+        Takes up to n tiles off the top of the deck
+        :return: the tiles, top first
+        """
+        end = min(self.__head + n, len(self.__codes))
+        tiles = [Tile.from_code(code) for code in self.__codes[self.__head:end]]
+        self.__head = end
+        if self.__head >= COMPACT_THRESHOLD and 2 * self.__head > len(self.__codes):
+            del self.__codes[:self.__head]
+            self.__head = 0
+        return tiles
+
+    def extend(self, tiles: Iterable[Tile]):
+        """
+        Puts the tiles at the bottom of the deck, in order
+        """
+        self.__codes.extend(tile.code() for tile in tiles)
+
+    def reverse(self):
+        """
+        Reverses the order of the deck in place
+        """
+        del self.__codes[:self.__head]
+        self.__head = 0
+        self.__codes.reverse()
+
+    def __len__(self) -> int:
+        return len(self.__codes) - self.__head
+
+    def __iter__(self) -> Iterator[Tile]:
+        return (Tile.from_code(code) for code in self.__codes[self.__head:])
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tile, List[Tile]]:
+        if isinstance(index, slice):
+            return [Tile.from_code(self.__codes[self.__head + i]) for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError("deck index out of range")
+        return Tile.from_code(self.__codes[self.__head + index % len(self)])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Deck):
+            return self.to_bytes() == other.to_bytes()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Deck({list(self)})"
@@ -1,17 +1,18 @@
 import random
-from copy import deepcopy
-from typing import List, Dict, Set, Union
+from copy import copy
+from typing import Iterable, List, Dict, Optional, Set, Union
 
+from Q.Common.deck import Deck
 from Q.Common.player_game_state import PlayerGameState
 from Q.Common.rulebook import Rulebook
 from Q.Common.Board.tile import Tile
+from Q.Common.Board.zobrist import Zobrist
 from Q.Common.map import Map
 from Q.Common.Board.pos import Pos
 from Q.Common.render import Render
+from Q.Common.seed_sequence import SeedSequence
 from Q.Common.Turn.turn import Turn
 from Q.Common.Turn.turn_outcome import TurnOutcome
-from Q.Common.Board.tile_color import TileColor
-from Q.Common.Board.tile_shape import TileShape
 from Q.Common.public_player_data import PublicPlayerData
 from Q.Referee.pair_results import PairResults
 
@@ -24,53 +25,84 @@ MAX_NUM_OF_TILES_IN_PLAYER_HAND = 6
 class GameState:
     """
     Represents the state of the game available to the referee
+    Players are kept in turn order in players and indexed by name, so looking a player up takes constant time.
+    Assigning players rebuilds the index.
+    The referee deck is a Deck, tiles assigned to it are copied into one.
+    Every game state draws its random numbers from its own generator, so games seeded alike play alike even when
+    other games run beside them.
     """
 
     def __init__(self, config: PublicPlayerData = None, tiles: List[Tile] = [],
-                 player_game_states: List[PlayerGameState] = [], given_map: Map = Map(), random_seed=None):
+                 player_game_states: List[PlayerGameState] = [], given_map: Map = Map(),
+                 random_seed: Union[int, SeedSequence, random.Random, None] = None):
         """
         :param config: the player public data - used for testing
-        :param tiles: the tiles in which the ref hold
+        :param tiles: the tiles in which the ref hold, a random deck if empty unless given as a Deck
         :param player_game_states: the states of all players
         :param given_map: the map at which you place tiles on
-        :param random_seed: the seed of the referee deck
+        :param random_seed: the seed of the game's random numbers, such as a child of a tournament's SeedSequence,
+        or a generator to draw them from, shared as is
         :param rulebook: the rules of the game
         """
-        self.players: List[PlayerGameState] = player_game_states
+        self.players = player_game_states
         self.consecutive_exc_or_rep = 0
+        if isinstance(random_seed, random.Random):
+            self.random = random_seed
+        elif isinstance(random_seed, SeedSequence):
+            self.random = random_seed.random()
+        else:
+            self.random = random.Random(random_seed)
 
         if config:
-            self.referee_deck = self.create_randomize_deck(config.num_ref_tiles, random_seed)
+            self.referee_deck = self.create_randomize_deck(config.num_ref_tiles)
             self.map = config.current_map
         else:
             self.map = given_map
-            if tiles:
+            if tiles or isinstance(tiles, Deck):
                 self.referee_deck = tiles
             else:
-                self.referee_deck = self.create_randomize_deck(NUM_OF_Q_TILES, random_seed)
+                self.referee_deck = self.create_randomize_deck(NUM_OF_Q_TILES)
+
+    @property
+    def players(self) -> List[PlayerGameState]:
+        """
+        The states of all players in turn order
+        """
+        return self.__players
+
+    @players.setter
+    def players(self, players: List[PlayerGameState]):
+        self.__players = players
+        self.__players_by_name: Dict[str, PlayerGameState] = {}
+        for player in players:
+            self.__players_by_name.setdefault(player.name, player)
+
+    @property
+    def referee_deck(self) -> Optional[Deck]:
+        """
+        The tiles the referee holds, top first
+        """
+        return self.__referee_deck
+
+    @referee_deck.setter
+    def referee_deck(self, tiles: Optional[Iterable[Tile]]):
+        self.__referee_deck = tiles if tiles is None or isinstance(tiles, Deck) else Deck(tiles)
 
     def place_ref_tile(self):
         """
         Takes first tile off the top of the ref deck and places at 0,0
+        The new map uses the same board backend as the current one.
         """
         ref_tile = {Pos(0, 0): self.draw_tiles(1)[0]}
-        self.map = Map(config=ref_tile)
+        self.map = type(self.map)(config=ref_tile)
 
-    def create_randomize_deck(self, num_of_ref_tiles=NUM_OF_Q_TILES, seed=None) -> List[Tile]:
+    def create_randomize_deck(self, num_of_ref_tiles=NUM_OF_Q_TILES, seed=None) -> Deck:
         """
         Initializes Q's set of num_of_ref_tiles, 6 different colors, 6 different shapes, 30 of each kind randomized.
+        :param seed: if given, the deck is shuffled by a new generator with this seed instead of the game's
         """
-        if seed:
-            random.seed(seed)
-
-        deck = []
-        for color in TileColor:
-            for shape in TileShape:
-                for _ in range(NUM_OF_EACH_KIND):
-                    deck.append(Tile(shape, color))
-
-        random.shuffle(deck)
-        return deck[:num_of_ref_tiles]
+        rng = self.random if seed is None else random.Random(seed)
+        return Deck.shuffled(NUM_OF_EACH_KIND, num_of_ref_tiles, rng)
 
     def setup_state(self):
         """
@@ -80,7 +112,7 @@ class GameState:
             self.referee_deck = self.create_randomize_deck(1080)
 
         if not len(self.map.tiles):
-            self.map = Map()
+            self.map = type(self.map)()
             self.place_ref_tile()
 
     def signup_player(self, player: PlayerGameState):
@@ -91,6 +123,7 @@ class GameState:
         """
         if len(self.players) < MAX_NUM_OF_PLAYERS:
             self.players.append(player)
+            self.__players_by_name.setdefault(player.name, player)
 
     def played_all_tiles(self) -> bool:
         """
@@ -100,10 +133,16 @@ class GameState:
         """
         return any(not len(player_game_state.hand) for player_game_state in self.players)
 
-    def get_player_by_name(self, name):
-        for player in self.players:
-            if player.name == name:
-                return player
+    def get_player_by_name(self, name: str) -> PlayerGameState:
+        """
+        Gets the state of the player with the given name, None if there is no such player. The index is rebuilt
+        when a name is missing, in case players was changed in place.
+        """
+        player = self.__players_by_name.get(name)
+        if player is None:
+            self.players = self.__players
+            player = self.__players_by_name.get(name)
+        return player
 
     def has_all_passed_or_exchanged_for_a_round(self):
         """
@@ -118,11 +157,41 @@ class GameState:
         :return the player public data of the game state
         """
         num_ref_tiles = len(self.referee_deck)
-        current_map = deepcopy(self.map)
+        current_map = self.map.fork()
         player = self.get_active_player(active_name)
         other_points = self.get_other_points(active_name)
         return PublicPlayerData(num_ref_tiles=num_ref_tiles, current_map=current_map, current_player_data=player, other_points=other_points)
 
+    def snapshot(self) -> "GameState":
+        """
+        Creates a copy of the game state that is not affected by later turns. The map is shared copy on write.
+        :return: the copy of the game state
+        """
+        state = copy(self)
+        state.random = copy(self.random)
+        state.map = self.map.snapshot()
+        state.players = [PlayerGameState(player.name, list(player.hand), player.points) for player in self.players]
+        state.referee_deck = Deck.from_bytes(self.referee_deck.to_bytes())
+        return state
+
+    def zobrist_hash(self) -> int:
+        """
+        A 64-bit hash identifying the state of the game: the Zobrist hash of the map combined with each player's
+        name, hand and points in turn order, the referee deck and the number of consecutive passes or replacements
+        :return: the hash
+        """
+        data = bytearray()
+        for player in self.players:
+            name = player.name.encode()
+            data += len(name).to_bytes(2, "little") + name
+            data.append(len(player.hand))
+            data += bytes(sorted(tile.code() for tile in player.hand))
+            data += player.points.to_bytes(8, "little", signed=True)
+        data += len(self.referee_deck).to_bytes(4, "little")
+        data += self.referee_deck.to_bytes()
+        data += self.consecutive_exc_or_rep.to_bytes(4, "little")
+        return self.map.zobrist_hash() ^ Zobrist.digest(bytes(data))
+
     def get_other_points(self, active_name: str) -> List[Union[PlayerGameState, int]]:
         """
         Gets public information that a player can know about the player queue. (their points)
@@ -137,9 +206,7 @@ class GameState:
         """
         Gets the active player's PlayerGameState
         """
-        for player in self.players:
-            if active_name == player.name:
-                return player
+        return self.get_player_by_name(active_name)
 
     def get_scores(self) -> Dict[str, int]:
         """
@@ -165,10 +232,10 @@ class GameState:
         if outcome is TurnOutcome.PLACED:
             self.turn_placed(turn.placements, name)
 
-        is_game_over = len(self.get_player_by_name(name).hand) == 0
-        additional_points = Rulebook.score_turn(turn.placements, self.map, self.get_player_by_name(name).hand,
-                                                     end_game=is_game_over)
-        self.get_player_by_name(name).points += additional_points
+        player = self.get_player_by_name(name)
+        is_game_over = len(player.hand) == 0
+        additional_points = Rulebook.score_turn(turn.placements, self.map, player.hand, end_game=is_game_over)
+        player.points += additional_points
         self.update_consecutive_exc_or_rep(outcome)
 
     def turn_placed(self, placements: Dict[Pos, Tile], name: str):
@@ -179,8 +246,9 @@ class GameState:
         """
         self.place_tiles(placements)
 
-        placed_tiles = list(placements.values())
-        self.get_player_by_name(name).hand = list(filter(lambda a: a not in placed_tiles, self.get_player_by_name(name).hand))
+        placed_tiles = set(placements.values())
+        player = self.get_player_by_name(name)
+        player.hand = list(filter(lambda a: a not in placed_tiles, player.hand))
 
     def draw_tiles_for_player(self, name: str) -> List[Tile]:
         """
@@ -188,18 +256,20 @@ class GameState:
         :param name: the name of the player
         :return: the tiles of the player
         """
-        num_of_new_tiles = MAX_NUM_OF_TILES_IN_PLAYER_HAND - len(self.get_player_by_name(name).hand)
+        player = self.get_player_by_name(name)
+        num_of_new_tiles = MAX_NUM_OF_TILES_IN_PLAYER_HAND - len(player.hand)
         new_tiles = self.draw_tiles(num_of_new_tiles)
-        self.get_player_by_name(name).hand.extend(new_tiles)
-        return self.get_player_by_name(name).hand
+        player.hand.extend(new_tiles)
+        return player.hand
 
     def turn_replace(self, name: str):
         """
         :param name: the players name
         Replaces tiles from hand with top of ref deck
         """
-        player_hand = self.get_player_by_name(name).hand
-        self.get_player_by_name(name).hand = []
+        player = self.get_player_by_name(name)
+        player_hand = player.hand
+        player.hand = []
         self.add_tiles_to_referee_deck(player_hand)
 
     def place_tiles(self, tiles: Dict[Pos, Tile]):
@@ -236,11 +306,7 @@ class GameState:
         """
         if n > len(self.referee_deck):
             return []
-        else:
-            tiles = deepcopy(self.referee_deck[:n])
-            del self.referee_deck[:n]
-
-        return tiles
+        return self.referee_deck.draw(n)
 
     def render(self):
         """
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import FrozenSet, List
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.symmetry import Symmetry
+from Q.Common.Board.tile import Tile
+from Q.Common.map import Map
+from Q.Common.rulebook import Rulebook
+
+DEFAULT_MAX_SIZE = 4096
+
+
+class LegalityCache:
+    """
+    Represents a bounded LRU cache of the legal positions of tiles, shared by anyone asking the same question of
+    the same board. Entries are keyed by the Zobrist hash of the board, the tile kind and the line the tiles
+    placed so far in the turn lie on, so boards reached through different placements share entries.
+    A canonical cache keys entries by the canonical form of the board instead, see Symmetry.canonicalize, so boards
+    that are rotations, reflections, translations or relabelings of each other share them too. Canonicalizing
+    takes time proportional to the board, so this pays off for small boards and expensive questions.
+    hits and misses count how lookups were answered.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, canonical: bool = False):
+        """
+        :param max_size: the number of entries kept before the least recently used ones are evicted
+        :param canonical: whether entries are keyed by the canonical form of the board
+        """
+        self.max_size = max_size
+        self.canonical = canonical
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get_legal_positions(self, given_map: Map, given_tile: Tile, placed_positions: List[Pos]) -> FrozenSet[Pos]:
+        """
+        Computes all of the legal positions to place the given tile onto the given map, see
+        Rulebook.get_legal_positions
+        :param placed_positions: the positions that have already been placed, all of which hold a tile on the map
+        :return: the set of valid positions
+        """
+        if self.canonical:
+            board_key, symmetry = Symmetry.canonicalize(given_map.tiles, [given_tile], relabel=True)
+            key_tile = symmetry.apply_tile(given_tile)
+            key_positions = [symmetry.apply_pos(pos) for pos in placed_positions]
+        else:
+            board_key, symmetry = given_map.zobrist_hash(), None
+            key_tile, key_positions = given_tile, placed_positions
+        key = (board_key, key_tile.code(), Rulebook.get_line(key_positions) if key_positions else None)
+        with self.lock:
+            positions = self.entries.get(key)
+            if positions is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return frozenset(map(symmetry.invert_pos, positions)) if symmetry else positions
+            self.misses += 1
+
+        positions = frozenset(Rulebook.get_legal_positions(given_map, given_tile, placed_positions))
+        with self.lock:
+            self.entries[key] = frozenset(map(symmetry.apply_pos, positions)) if symmetry else positions
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return positions
+
+    def get_legal_hand(self, given_map: Map, hand: List[Tile], placed_positions: List[Pos]) -> List[Tile]:
+        """
+        Gets the tiles of the hand that have a legal position, see Rulebook.get_legal_hand
+        """
+        return [tile for tile in hand if self.get_legal_positions(given_map, tile, placed_positions)]
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
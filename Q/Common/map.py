@@ -1,15 +1,36 @@
-from typing import Dict, List, Callable, Set
+import struct
+import weakref
+from typing import Dict, List, Callable, Set, Tuple, Optional
 from collections import defaultdict
 
 
-from Q.Common.Board.tile import Tile
+from Q.Common.Board.segment import Axis, Segment
+from Q.Common.Board.slot_constraint import SlotConstraint
+from Q.Common.Board.tile import Tile, NUM_OF_KINDS
+from Q.Common.Board.zobrist import Zobrist
 from Q.Common.Board.pos import Pos
 from Q.Util.pos_funcs import PosFuncs
 
+# The layout of one tile in Map.to_bytes: x, y and the tile's code
+TILE_RECORD = struct.Struct("<hhB")
+
 
 class Map:
     """
     Represents a grid layout for a possibly very large board game
+    Alongside the tiles, the map maintains its frontier: every empty position next to a placed tile, mapped to
+    a summary of what its neighbors require of a tile placed there, and for each of the 36 tile kinds the set of
+    frontier slots that kind may occupy. It also indexes the contiguous row and col segments every placed tile
+    belongs to. Tiles must be added through add_tile_to_board to keep these up to date.
+    fork and snapshot copy a map in constant time: the copies share the tiles and the indexes with the original
+    (copy on write). Sharing is per structure: a map about to change a structure that another live map of its
+    family, forked from it or from the same map, still holds copies the whole structure first. Only maps that are
+    still referenced count, so once the forks handed out for a turn are dropped, the original changes its
+    structures in place again and placing on it takes constant time. A fork that is placed on while its
+    original is alive pays for the copy, once.
+    Placements can be tried speculatively: between begin and rollback every change to the map is journaled, and
+    rollback undoes them in time proportional to the number of tiles placed since begin.
+    The map also keeps the Zobrist hash of its tiles up to date, so equal boards can be recognized cheaply.
     """
 
     def __init__(self, ref_tile: Tile = None, config: Dict[Pos, Tile] = None):
@@ -18,12 +39,169 @@ class Map:
         :param ref_tile: the tile a ref may place at the start at (0,0). Default value is None
         :param config: a dictionary of given tiles to start the game from a specific state
         """
-        if config:
-            self.tiles = config
-        else:
-            self.tiles = defaultdict()
+        self.tiles = self.create_tiles(config)
+        self.frontier: Dict[Pos, SlotConstraint] = {}
+        self.slots_by_code: List[Set[Pos]] = [set() for _ in range(NUM_OF_KINDS)]
+        self.segments: Dict[int, Segment] = {}
+        self.row_segment_ids: Dict[Pos, int] = {}
+        self.col_segment_ids: Dict[Pos, int] = {}
+        self.next_segment_id = 0
+        self.__shared_fields: Set[str] = set()
+        self.__shared_slots = 0
+        self.__family: List[weakref.ref] = [weakref.ref(self)]
+        self.__read_only = False
+        self.__journal: List[Tuple[str, object, object]] = []
+        self.__transactions: List[Tuple[int, int, int]] = []
+        self.__zobrist_hash = 0
+        for pos, tile in list(self.tiles.items()):
+            self.__zobrist_hash ^= Zobrist.tile_key(pos, tile)
+            self.update_frontier(pos)
+            self.update_segments(pos, tile)
         if ref_tile:
-            self.tiles[Pos(0, 0)] = ref_tile
+            self.add_tile_to_board(ref_tile, Pos(0, 0))
+
+    def create_tiles(self, config: Dict[Pos, Tile] = None) -> Dict[Pos, Tile]:
+        """
+        Creates the storage backend holding the tiles of this board. Subclasses override this to change how tiles
+        are stored, e.g. ArrayMap.
+        :param config: the tiles to start with. A given dictionary is used as is
+        :return: a mapping from positions to tiles
+        """
+        if config:
+            return config
+        return defaultdict()
+
+    def fork(self) -> "Map":
+        """
+        Creates a copy of this map that can be changed independently of it. Nothing is copied until either map
+        changes a structure the other one still holds, see the class comment.
+        :return: the copy of the map
+        """
+        forked = object.__new__(type(self))
+        forked.__dict__.update(self.__dict__)
+        self.__share_all()
+        forked.__share_all()
+        forked.__read_only = False
+        forked.__journal = []
+        forked.__transactions = []
+        self.__family.append(weakref.ref(forked))
+        return forked
+
+    def snapshot(self) -> "Map":
+        """
+        Creates a read-only copy of this map that keeps its current tiles no matter what is later placed on this map
+        :return: the frozen copy of the map
+        """
+        snapshot = self.fork()
+        snapshot.__read_only = True
+        return snapshot
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state["_Map__family"]
+        state["_Map__shared_fields"] = set()
+        state["_Map__shared_slots"] = 0
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__family = [weakref.ref(self)]
+
+    def __share_all(self):
+        """
+        Marks every structure of the map as possibly shared with another map
+        """
+        self.__shared_fields = {"tiles", "frontier", "slots_by_code", "segments", "row_segment_ids",
+                                "col_segment_ids"}
+        self.__shared_slots = (1 << NUM_OF_KINDS) - 1
+
+    def __own(self, field: str):
+        """
+        Copies a structure before it is changed if another live map of the family still holds it
+        :param field: the name of the attribute holding the structure
+        """
+        if field in self.__shared_fields:
+            self.__shared_fields.discard(field)
+            structure = getattr(self, field)
+            if any(getattr(other, field) is structure for other in self.__get_relatives()):
+                setattr(self, field, structure.copy())
+
+    def __own_slots(self, codes: int):
+        """
+        Copies the slot sets of the given tile codes that another live map of the family still holds before they
+        are changed
+        :param codes: a bitmask of tile codes
+        """
+        self.__own("slots_by_code")
+        codes &= self.__shared_slots
+        self.__shared_slots &= ~codes
+        others = [other.slots_by_code for other in self.__get_relatives()]
+        while codes:
+            lowest = codes & -codes
+            code = lowest.bit_length() - 1
+            if any(slots[code] is self.slots_by_code[code] for slots in others):
+                self.slots_by_code[code] = set(self.slots_by_code[code])
+            codes ^= lowest
+
+    def __get_relatives(self) -> List["Map"]:
+        """
+        Gets the other maps forked from this one, from the same map or from each other that are still referenced,
+        and forgets the ones that are not
+        """
+        members = [(reference, reference()) for reference in self.__family]
+        self.__family[:] = [reference for reference, member in members if member is not None]
+        return [member for _, member in members if member is not None and member is not self]
+
+    def begin(self):
+        """
+        Starts a transaction: the changes made to the map from now on can be undone with rollback.
+        Transactions can be nested, each rollback or commit ends the innermost one.
+        """
+        self.__transactions.append((len(self.__journal), self.next_segment_id, self.__zobrist_hash))
+
+    def apply(self, placements: Dict[Pos, Tile]):
+        """
+        Adds the given placements to the board in order. Assumes they are valid.
+        :param placements: Placements to be put on the map
+        """
+        for pos, tile in placements.items():
+            self.add_tile_to_board(tile, pos)
+
+    def rollback(self):
+        """
+        Ends the innermost transaction and undoes every change made to the map since it began
+        """
+        journal_length, next_segment_id, zobrist_hash = self.__transactions.pop()
+        outer_transactions, self.__transactions = self.__transactions, []
+        while len(self.__journal) > journal_length:
+            field, key, old_value = self.__journal.pop()
+            self.__own(field)
+            if field == "frontier":
+                self.__set_slot(key, old_value)
+            elif old_value is None:
+                getattr(self, field).pop(key, None)
+            else:
+                getattr(self, field)[key] = old_value
+        self.next_segment_id = next_segment_id
+        self.__zobrist_hash = zobrist_hash
+        self.__transactions = outer_transactions
+
+    def commit(self):
+        """
+        Ends the innermost transaction and keeps its changes. They can still be undone by an enclosing transaction.
+        """
+        self.__transactions.pop()
+        if not self.__transactions:
+            self.__journal.clear()
+
+    def __remember(self, field: str, key):
+        """
+        Journals the current value of an entry of one of the map's structures, if a transaction is open
+        :param field: the name of the attribute holding the structure
+        :param key: the key of the entry about to change
+        """
+        if self.__transactions:
+            self.__journal.append((field, key, getattr(self, field).get(key)))
 
     def add_tiles_to_board_dict(self, placement: Dict[Pos, Tile]):
         """
@@ -41,7 +219,177 @@ class Map:
         :param tile: The tile to be added to the board
         :param pos: the position of the tile
         """
+        if self.__read_only:
+            raise Exception("Tiles cannot be placed on a map snapshot")
+        self.__own("tiles")
+        replaced = self.tiles.get(pos)
+        if self.__transactions:
+            self.__journal.append(("tiles", pos, replaced))
         self.tiles[pos] = tile
+        self.__zobrist_hash ^= Zobrist.tile_key(pos, tile)
+        if replaced is not None:
+            self.__zobrist_hash ^= Zobrist.tile_key(pos, replaced)
+        self.update_frontier(pos)
+        self.update_segments(pos, tile, replaced)
+
+    def zobrist_hash(self) -> int:
+        """
+        The 64-bit Zobrist hash of the board: the xor of the keys of every tile at its position. Boards holding the
+        same tiles at the same positions have the same hash, whatever order the tiles were placed in.
+        :return: the hash
+        """
+        return self.__zobrist_hash
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the tiles of the board compactly, five bytes per tile: the x and y of its position as signed 16-bit
+        integers and its code. This is how boards are sent to other processes.
+        :return: the encoded tiles
+        """
+        data = bytearray()
+        for pos, tile in self.tiles.items():
+            data += TILE_RECORD.pack(pos.x, pos.y, tile.code())
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Map":
+        """
+        Decodes a board encoded by to_bytes, rebuilding the frontier, the segments and the hash
+        :param data: the encoded tiles
+        :return: a new map of this class holding the tiles
+        """
+        tiles = {Pos(x, y): Tile.from_code(code) for x, y, code in TILE_RECORD.iter_unpack(data)}
+        return cls(config=tiles)
+
+    def update_frontier(self, pos: Pos):
+        """
+        Updates the frontier around a position whose tile just changed. Only the position itself and its four
+        neighbors can be affected, so this takes constant time.
+        :param pos: the position that changed
+        """
+        self.__own("frontier")
+        x, y = pos.x, pos.y
+        for slot in (pos, Pos(x, y + 1), Pos(x, y - 1), Pos(x - 1, y), Pos(x + 1, y)):
+            if slot in self.tiles:
+                self.__set_slot(slot, None)
+                continue
+            neighbor_tiles = self.get_neighbor_tiles(slot)
+            if any(neighbor_tiles):
+                self.__set_slot(slot, SlotConstraint.from_neighbors(*neighbor_tiles))
+            else:
+                self.__set_slot(slot, None)
+
+    def __set_slot(self, slot: Pos, constraint: Optional[SlotConstraint]):
+        """
+        Sets or clears the constraint of a frontier slot and moves the slot between the per-kind slot sets
+        :param slot: the empty position
+        :param constraint: the new constraint, None if the position is no longer on the frontier
+        """
+        old_constraint = self.frontier.pop(slot, None)
+        if self.__transactions and old_constraint != constraint:
+            self.__journal.append(("frontier", slot, old_constraint))
+        old_codes = old_constraint.codes if old_constraint else 0
+        new_codes = 0
+        if constraint:
+            self.frontier[slot] = constraint
+            new_codes = constraint.codes
+
+        removed = old_codes & ~new_codes
+        added = new_codes & ~old_codes
+        if (removed | added) & self.__shared_slots:
+            self.__own_slots(removed | added)
+        while removed:
+            lowest = removed & -removed
+            self.slots_by_code[lowest.bit_length() - 1].discard(slot)
+            removed ^= lowest
+        while added:
+            lowest = added & -added
+            self.slots_by_code[lowest.bit_length() - 1].add(slot)
+            added ^= lowest
+
+    def update_segments(self, pos: Pos, tile: Tile, replaced: Optional[Tile] = None):
+        """
+        Joins a newly placed tile with the row and col segments on either side of it
+        :param pos: the position of the placed tile
+        :param tile: the placed tile
+        :param replaced: the tile previously at this position, if the placement overwrote one
+        """
+        self.__own("segments")
+        self.__own("row_segment_ids")
+        self.__own("col_segment_ids")
+        for axis in Axis:
+            segment_ids_field = self.__segment_ids_field(axis)
+            segment_ids = getattr(self, segment_ids_field)
+            if replaced is not None and pos in segment_ids:
+                segment_id = segment_ids[pos]
+                self.__remember("segments", segment_id)
+                self.segments[segment_id] = self.segments[segment_id].recount(replaced, tile)
+            else:
+                self.__join_segments(axis, segment_ids_field, pos, tile)
+
+    def __join_segments(self, axis: Axis, segment_ids_field: str, pos: Pos, tile: Tile):
+        """
+        Merges the single tile segment at pos with its neighbors on the given axis. The longer neighbor keeps its
+        id and the cells of the shorter one are repointed, so repeated merging stays cheap.
+        """
+        segment_ids = getattr(self, segment_ids_field)
+        x, y = pos.x, pos.y
+        lower, upper = (Pos(x - 1, y), Pos(x + 1, y)) if axis is Axis.ROW else (Pos(x, y - 1), Pos(x, y + 1))
+        lower_id = segment_ids.get(lower)
+        upper_id = segment_ids.get(upper)
+        lower_segment = self.segments.get(lower_id)
+        upper_segment = self.segments.get(upper_id)
+        joined = Segment.of_tile(axis, pos, tile).join(lower_segment).join(upper_segment)
+
+        if lower_segment is None and upper_segment is None:
+            segment_id = self.next_segment_id
+            self.next_segment_id += 1
+            absorbed_id = None
+        elif upper_segment is None or (lower_segment is not None and len(lower_segment) >= len(upper_segment)):
+            segment_id, absorbed_id = lower_id, upper_id
+        else:
+            segment_id, absorbed_id = upper_id, lower_id
+
+        if absorbed_id is not None:
+            self.__remember("segments", absorbed_id)
+            for absorbed_pos in self.segments.pop(absorbed_id).positions():
+                self.__remember(segment_ids_field, absorbed_pos)
+                segment_ids[absorbed_pos] = segment_id
+        self.__remember(segment_ids_field, pos)
+        segment_ids[pos] = segment_id
+        self.__remember("segments", segment_id)
+        self.segments[segment_id] = joined
+
+    @staticmethod
+    def __segment_ids_field(axis: Axis) -> str:
+        return "row_segment_ids" if axis is Axis.ROW else "col_segment_ids"
+
+    def get_row_segment(self, pos: Pos) -> Optional[Segment]:
+        """
+        Gets the contiguous row segment a placed tile belongs to
+        :param pos: the position of a placed tile
+        :return: the segment, or None if there is no tile at pos
+        """
+        segment_id = self.row_segment_ids.get(pos)
+        return None if segment_id is None else self.segments[segment_id]
+
+    def get_col_segment(self, pos: Pos) -> Optional[Segment]:
+        """
+        Gets the contiguous col segment a placed tile belongs to
+        :param pos: the position of a placed tile
+        :return: the segment, or None if there is no tile at pos
+        """
+        segment_id = self.col_segment_ids.get(pos)
+        return None if segment_id is None else self.segments[segment_id]
+
+    def get_candidate_slots(self, tile: Tile) -> Set[Pos]:
+        """
+        Gets the frontier slots where the given tile fits its neighbors
+        Note: this is the map's own index, callers must copy it before mutating it.
+        :param tile: the tile to be placed
+        :return: the set of positions
+        """
+        return self.slots_by_code[tile.code()]
 
     def get_number_of_tile_neighbors(self, pos: Pos):
         neighbors = self.get_neighbors(pos)
@@ -64,6 +412,16 @@ class Map:
             PosFuncs.right(pos): self.tiles.get(PosFuncs.right(pos))
         }
 
+    def get_neighbor_tiles(self, pos: Pos) -> Tuple[Optional[Tile], Optional[Tile], Optional[Tile], Optional[Tile]]:
+        """
+        gets the tiles immediately above, below, left and right of a given position, without building positions
+        :param pos: the position of on the map of whose neighbors you get from.
+        :return: the (above, below, left, right) tiles, None where there is no tile
+        """
+        get = self.tiles.get
+        x, y = pos.x, pos.y
+        return get(Pos(x, y + 1)), get(Pos(x, y - 1)), get(Pos(x - 1, y)), get(Pos(x + 1, y))
+
     def get_contiguous(self, direction: Callable[[Pos], Pos], pos: Pos) -> List[Pos]:
         """
         Gets all positions in contiguous direction
@@ -86,6 +444,10 @@ class Map:
         :param pos: Position to find contiguous row for
         :return: List of positions in contiguous row
         """
+        segment = self.get_row_segment(pos)
+        if segment is not None:
+            return self.__positions_through(segment, range(pos.x - 1, segment.start - 1, -1), pos,
+                                            range(pos.x + 1, segment.end + 1))
         positions = set()
         positions.update(self.get_contiguous(PosFuncs.left, pos))
         positions.add(pos)
@@ -98,12 +460,27 @@ class Map:
         :param pos: Position to find contiguous col for
         :return: List of positions in contiguous col
         """
+        segment = self.get_col_segment(pos)
+        if segment is not None:
+            return self.__positions_through(segment, range(pos.y + 1, segment.end + 1), pos,
+                                            range(pos.y - 1, segment.start - 1, -1))
         positions = set()
         positions.update(self.get_contiguous(PosFuncs.above, pos))
         positions.add(pos)
         positions.update(self.get_contiguous(PosFuncs.below, pos))
         return positions
 
+    @staticmethod
+    def __positions_through(segment: Segment, before: range, pos: Pos, after: range) -> Set[Pos]:
+        """
+        Builds the set of a segment's positions, inserting them in the same order as walking away from pos
+        with get_contiguous would, so that iterating the set gives the same order as before segments existed.
+        """
+        positions = set(segment.pos_at(coordinate) for coordinate in before)
+        positions.add(pos)
+        positions.update(segment.pos_at(coordinate) for coordinate in after)
+        return positions
+
 
     def get_seen_contiguous_items(self, get_contiguous_axis: Callable[[Pos], Set[Pos]], positions: List[Pos]) -> Set[Pos]:
         """
@@ -1,9 +1,14 @@
-from typing import Dict, Set, Callable, List
+from dataclasses import replace
+from typing import Callable, Dict, FrozenSet, Iterator, Set, List, Optional, Tuple
 
 from Q.Util.Configurations.score_config import ScoreConfig
-from Q.Util.pos_funcs import PosFuncs
+from Q.Common.Board.segment import Axis, Segment
+from Q.Common.Board.slot_constraint import SlotConstraint
 from Q.Common.Board.tile import Tile
+from Q.Common.Board.tile_color import TileColor
+from Q.Common.Board.tile_shape import TileShape
 from Q.Common.map import Map
+from Q.Common.score_breakdown import ScoreBreakdown
 from Q.Common.Board.pos import Pos
 
 END_BONUS = 4
@@ -25,42 +30,129 @@ class Rulebook:
         :param given_tile: the tile that is placed
         :return: a set of valid positions
         """
-        valid_positions: Set[Pos] = set()
-        for p, tile in given_map.tiles.items():
-            if tile.shape != given_tile.shape and tile.color != given_tile.color:
-                continue
-            neighbors: Dict[Pos, Tile] = given_map.get_neighbors(p)
-            valid_neighbor_positions = Rulebook.filter_adjacent_positions(neighbors, given_tile, given_map)
-            for neighbor in valid_neighbor_positions:
-                potential_positions = placed_positions.copy()
-                potential_positions.append(neighbor)
-                if Rulebook.all_same_row_or_col(potential_positions):
-                    valid_positions.add(neighbor)
-
-        return valid_positions
+        if not placed_positions:
+            return set(given_map.get_candidate_slots(given_tile))
+        in_line = Rulebook.in_line_with(placed_positions)
+        return {pos for pos in given_map.get_candidate_slots(given_tile) if in_line(pos)}
 
     @staticmethod
     def get_all_positions(given_map: Map, given_tile: Tile) -> Set[Pos]:
         """
         Finds valid positions without checking for same row/col in turn
         """
-        valid_positions: Set[Pos] = set()
-        for p, tile in given_map.tiles.items():
-            if tile.shape != given_tile.shape and tile.color != given_tile.color:
-                continue
-            neighbors: Dict[Pos, Tile] = given_map.get_neighbors(p)
-            valid_neighbor_positions = Rulebook.filter_adjacent_positions(neighbors, given_tile, given_map)
-            for neighbor in valid_neighbor_positions:
-                valid_positions.add(neighbor)
+        return set(given_map.get_candidate_slots(given_tile))
 
-        return valid_positions
+    @staticmethod
+    def in_line_with(placed_positions: List[Pos]) -> Callable[[Pos], bool]:
+        """
+        Builds a check for whether a position would keep the given positions in the same row or col.
+        Equivalent to all_same_row_or_col(placed_positions + [pos]) without rebuilding the list per position.
+        :param placed_positions: the positions that have already been placed
+        :return: a predicate on positions
+        """
+        if not placed_positions:
+            return lambda pos: True
+        same_x, same_y = Rulebook.get_line(placed_positions)
+        return lambda pos: pos.x == same_x or pos.y == same_y
+
+    @staticmethod
+    def get_line(placed_positions: List[Pos]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Gets the line the given positions lie on
+        :param placed_positions: the positions that have already been placed, at least one
+        :return: the x shared by all positions or None, and the y shared by all positions or None
+        """
+        xs = set(pos.x for pos in placed_positions)
+        ys = set(pos.y for pos in placed_positions)
+        same_x = next(iter(xs)) if len(xs) == 1 else None
+        same_y = next(iter(ys)) if len(ys) == 1 else None
+        return same_x, same_y
 
     @staticmethod
     def get_legal_hand(given_map: Map, hand: List[Tile], already_placed: List[Pos]) -> List[Tile]:
         """
         Gets the legal hand based on the rulebook
         """
-        return list(filter(lambda tile: len(Rulebook.get_legal_positions(given_map, tile, already_placed)) != 0, hand))
+        in_line = Rulebook.in_line_with(already_placed)
+        return [tile for tile in hand if any(in_line(pos) for pos in given_map.get_candidate_slots(tile))]
+
+    @staticmethod
+    def get_legal_moves(given_map: Map, hand: List[Tile], placed_positions: List[Pos]) -> Dict[Pos, List[Tile]]:
+        """
+        Computes every legal single tile move for a whole hand at once, from the frontier slots the map keeps for
+        each kind of tile
+        :param given_map: the map searched for valid positions
+        :param hand: the tiles that could be placed, duplicates are reported once
+        :param placed_positions: the positions that have already been placed this turn
+        :return: a mapping from each legal position to the tiles of the hand that can be placed there, in hand order
+        """
+        in_line = Rulebook.in_line_with(placed_positions)
+        moves: Dict[Pos, List[Tile]] = {}
+        for tile in dict.fromkeys(hand):
+            for pos in given_map.get_candidate_slots(tile):
+                if in_line(pos):
+                    moves.setdefault(pos, []).append(tile)
+        return moves
+
+    @staticmethod
+    def generate_placements(given_map: Map, hand: List[Tile], max_tiles: Optional[int] = None) \
+            -> Iterator[Dict[Pos, Tile]]:
+        """
+        Lazily enumerates every legal turn placing tiles from the given hand. Lines are grown one tile at a time
+        from each frontier slot, checking each tile against the map as it stands after the tiles before it.
+        Each distinct set of placements is generated once, in an order Rulebook.valid_placements accepts, and
+        identical tiles of the hand are interchangeable, so each kind is only tried once per position.
+        The search runs on a fork of the given map, which is never changed.
+        :param given_map: the map to place tiles on
+        :param hand: the tiles that can be placed
+        :param max_tiles: the most tiles a generated turn may place, all of the hand by default
+        :return: a generator of placements, each a new mapping from position to tile in placement order
+        """
+        tiles_by_code: Dict[int, Tile] = {}
+        counts: Dict[int, int] = {}
+        for tile in hand:
+            tiles_by_code.setdefault(tile.code(), tile)
+            counts[tile.code()] = counts.get(tile.code(), 0) + 1
+        max_tiles = len(hand) if max_tiles is None else min(max_tiles, len(hand))
+        return Rulebook.__extend_placements(given_map.fork(), {}, frozenset(), counts, tiles_by_code, set(),
+                                            max_tiles)
+
+    @staticmethod
+    def __extend_placements(board: Map, placed: Dict[Pos, Tile], placed_key: FrozenSet[Tuple[Pos, int]],
+                            counts: Dict[int, int], tiles_by_code: Dict[int, Tile],
+                            visited: Set[FrozenSet[Tuple[Pos, int]]], max_tiles: int) -> Iterator[Dict[Pos, Tile]]:
+        """
+        Generates the placements extending the given ones by at least one tile. The board already holds the
+        placed tiles. A set of placements reached a second time, in another order, is skipped with everything
+        that extends it, since the board, the line and the remaining hand only depend on the set.
+        :param placed_key: the set of (position, tile code) pairs placed so far
+        :param counts: the number of tiles of each code left in the hand
+        :param visited: the sets of placements generated so far
+        """
+        if len(placed) == max_tiles:
+            return
+        in_line = Rulebook.in_line_with(list(placed))
+        for code in list(counts):
+            if not counts[code]:
+                continue
+            tile = tiles_by_code[code]
+            positions = sorted((pos for pos in board.get_candidate_slots(tile) if in_line(pos)),
+                               key=lambda pos: (pos.y, pos.x))
+            for pos in positions:
+                key = placed_key | {(pos, code)}
+                if key in visited:
+                    continue
+                visited.add(key)
+                placed[pos] = tile
+                counts[code] -= 1
+                board.begin()
+                board.add_tile_to_board(tile, pos)
+                yield dict(placed)
+                yield from Rulebook.__extend_placements(board, placed, key, counts, tiles_by_code, visited,
+                                                        max_tiles)
+                board.rollback()
+                counts[code] += 1
+                del placed[pos]
 
     @staticmethod
     def filter_adjacent_positions(neighbors: Dict[Pos, Tile], given_tile: Tile, map: Map) -> Set[Pos]:
@@ -90,18 +182,12 @@ class Rulebook:
         :param given_tile: the tile we are trying to place
         :return: true if the tile can be placed
         """
-        nbrs: Dict[Pos, Tile] = given_map.get_neighbors(pos)
+        above, below, left, right = given_map.get_neighbor_tiles(pos)
 
-        def compare_features(call1: Callable[[Pos], Pos], call2: Callable[[Pos], Pos], p: Pos,
-                             comparator: Callable[[Tile, Tile], bool]) -> bool:
-            if p is None:
-                return False
-            return comparator(given_tile, nbrs[call1(p)]) and comparator(given_tile, nbrs[call2(p)])
-
-        shapes_same_vert = compare_features(PosFuncs.above, PosFuncs.below, pos, Rulebook.compatible_shapes)
-        shapes_same_hor = compare_features(PosFuncs.left, PosFuncs.right, pos, Rulebook.compatible_shapes)
-        colors_same_vert = compare_features(PosFuncs.above, PosFuncs.below, pos, Rulebook.compatible_colors)
-        colors_same_hor = compare_features(PosFuncs.left, PosFuncs.right, pos, Rulebook.compatible_colors)
+        shapes_same_vert = Rulebook.compatible_shapes(given_tile, above) and Rulebook.compatible_shapes(given_tile, below)
+        shapes_same_hor = Rulebook.compatible_shapes(given_tile, left) and Rulebook.compatible_shapes(given_tile, right)
+        colors_same_vert = Rulebook.compatible_colors(given_tile, above) and Rulebook.compatible_colors(given_tile, below)
+        colors_same_hor = Rulebook.compatible_colors(given_tile, left) and Rulebook.compatible_colors(given_tile, right)
 
         return (shapes_same_vert or colors_same_vert) and (shapes_same_hor or colors_same_hor)
 
@@ -119,16 +205,39 @@ class Rulebook:
     def valid_placements(given_map: Map, tiles_placed: Dict[Pos, Tile]) -> bool:
         """
         if the given tiles can be placed according to the rules of the Q game
+        The tiles are checked in order, each against its neighbors on the map and among the tiles placed before
+        it, so the check takes time proportional to the number of tiles placed and the map is left unchanged.
         :param given_map: the given map we are placing tiles at
         :param tiles_placed: the tiles attempting to be placed
         returns true if the tiles can be placed
         """
+        if not tiles_placed:
+            return True
+        if not Rulebook.all_same_row_or_col(list(tiles_placed.keys())):
+            return False
+        placed_so_far: Dict[Pos, Tile] = {}
         for pos, tile in tiles_placed.items():
-            if pos not in Rulebook.get_legal_positions(given_map, tile, list(tiles_placed.keys())):
+            if pos in given_map.tiles or not Rulebook.__fits_with(given_map, placed_so_far, pos, tile):
                 return False
-            given_map.add_tile_to_board(tile, pos)
+            placed_so_far[pos] = tile
         return True
 
+    @staticmethod
+    def __fits_with(given_map: Map, placed_so_far: Dict[Pos, Tile], pos: Pos, tile: Tile) -> bool:
+        """
+        Can the tile be placed at the empty position of the map once the tiles placed so far are added to it?
+        :param placed_so_far: tiles that are not on the map yet but count as placed
+        :return: true if the position touches a tile and the tile fits its neighbors on both axes
+        """
+        x, y = pos.x, pos.y
+        neighbor_positions = (Pos(x, y + 1), Pos(x, y - 1), Pos(x - 1, y), Pos(x + 1, y))
+        if not any(neighbor in placed_so_far for neighbor in neighbor_positions):
+            constraint = given_map.frontier.get(pos)
+            return constraint is not None and constraint.accepts(tile)
+        neighbor_tiles = [placed_so_far.get(neighbor, neighbor_tile)
+                          for neighbor, neighbor_tile in zip(neighbor_positions, given_map.get_neighbor_tiles(pos))]
+        return SlotConstraint.from_neighbors(*neighbor_tiles).accepts(tile)
+
     @staticmethod
     def compatible_shapes( tile1: Tile, tile2: Tile):
         return tile1 is None or tile2 is None or tile1.compatible_shape(tile2)
@@ -149,14 +258,139 @@ class Rulebook:
         :param curr_map: Current map to score turn
         :return: the points scored on a turn
         """
-        points_in_turn = 0
-        points_in_turn += Rulebook.score_place_tiles(tiles)
-        positions = [pos for pos in tiles.keys()]
-        points_in_turn += Rulebook.get_contiguous_sequence_points(curr_map, positions)
-        points_in_turn += Rulebook.get_completing_q_points(curr_map, positions, score_config)
-        if end_game:
-            points_in_turn += Rulebook.score_end_bonus_points(player_hand, score_config)
-        return points_in_turn
+        return Rulebook.score_turn_breakdown(tiles, curr_map, player_hand, end_game, score_config).total()
+
+    @staticmethod
+    def score_turn_breakdown(tiles: Dict[Pos, Tile], curr_map: Map, player_hand: List[Tile], end_game=False,
+                             score_config: ScoreConfig = ScoreConfig()) -> ScoreBreakdown:
+        """
+        Calculates the points scored on a given turn, split by the rule that awarded them.
+        The distinct rows and cols holding the placed tiles are found once and scored from the shape and color
+        counts of their segments.
+        Note: Everything has already been placed before scoring. So it's fine if the player hand is empty.
+        :param tiles: the tiles placed which is a mapping from position to tile
+        :param end_game: is the game over which add the end bonus points
+        :param player_hand: Player's current hand
+        :param curr_map: Current map to score turn
+        :return: the breakdown of the points scored on a turn
+        """
+        lines = Rulebook.get_affected_lines(curr_map, list(tiles.keys()))
+        return ScoreBreakdown(
+            placement=Rulebook.score_place_tiles(tiles),
+            sequence=Rulebook.__get_lines_sequence_points(lines),
+            q_bonus=Rulebook.__get_lines_q_points(curr_map, lines, score_config),
+            end_bonus=Rulebook.score_end_bonus_points(player_hand, score_config) if end_game else 0)
+
+    @staticmethod
+    def get_affected_lines(curr_map: Map, positions: List[Pos]) -> Dict[Segment, Pos]:
+        """
+        Gets the distinct rows and cols holding the given positions
+        :param positions: List of positions played in a given turn, all of which hold a tile on the map
+        :return: a mapping from each row and col segment to the first of the positions it holds
+        """
+        lines = {}
+        for position in positions:
+            lines.setdefault(curr_map.get_row_segment(position), position)
+            lines.setdefault(curr_map.get_col_segment(position), position)
+        return lines
+
+    @staticmethod
+    def score_candidates(given_map: Map, candidates: List[Dict[Pos, Tile]], player_hand: Optional[List[Tile]] = None,
+                         score_config: ScoreConfig = ScoreConfig()) -> List[ScoreBreakdown]:
+        """
+        Scores a batch of candidate turns on the given map without placing them. The rows and cols each candidate
+        would form are summarized from the map's segments and the candidate's own tiles, and the q points of a
+        line summary are computed once for all candidates sharing it.
+        Note: the candidates are assumed to be valid placements on the map.
+        :param given_map: the map the candidates would be placed on
+        :param candidates: the placements to score, each a mapping from position to tile
+        :param player_hand: the hand the tiles come from. If given, candidates that empty it earn the end bonus
+        :param score_config: configured point values
+        :return: the breakdown of each candidate's score, in order
+        """
+        q_points_by_line: Dict[Segment, Optional[int]] = {}
+        return [Rulebook.__score_candidate(given_map, candidate, player_hand, score_config, q_points_by_line)
+                for candidate in candidates]
+
+    @staticmethod
+    def __score_candidate(given_map: Map, candidate: Dict[Pos, Tile], player_hand: Optional[List[Tile]],
+                          score_config: ScoreConfig, q_points_by_line: Dict[Segment, Optional[int]]) -> ScoreBreakdown:
+        """
+        Scores one candidate turn without placing it
+        :param q_points_by_line: the q points of the line summaries seen so far, None for lines scored tile by tile
+        :return: the breakdown of the candidate's score
+        """
+        lines = {}
+        for position in candidate:
+            for axis in Axis:
+                lines.setdefault(Rulebook.__get_line_after(given_map, candidate, axis, position), position)
+
+        q_bonus = 0
+        for segment, position in lines.items():
+            if segment not in q_points_by_line:
+                q_points_by_line[segment] = Rulebook.__get_counted_q_points(segment, score_config)
+            points = q_points_by_line[segment]
+            if points is None:
+                return Rulebook.__score_candidate_on_fork(given_map, candidate, player_hand, score_config)
+            q_bonus += points
+
+        return ScoreBreakdown(
+            placement=Rulebook.score_place_tiles(candidate),
+            sequence=Rulebook.__get_lines_sequence_points(lines),
+            q_bonus=q_bonus,
+            end_bonus=Rulebook.__get_candidate_end_bonus(candidate, player_hand, score_config))
+
+    @staticmethod
+    def __score_candidate_on_fork(given_map: Map, candidate: Dict[Pos, Tile], player_hand: Optional[List[Tile]],
+                                  score_config: ScoreConfig) -> ScoreBreakdown:
+        """
+        Scores a candidate by placing it on a fork of the map, for the rare lines that are scored tile by tile
+        :return: the breakdown of the candidate's score
+        """
+        forked_map = given_map.fork()
+        forked_map.apply(candidate)
+        breakdown = Rulebook.score_turn_breakdown(candidate, forked_map, [], score_config=score_config)
+        return replace(breakdown, end_bonus=Rulebook.__get_candidate_end_bonus(candidate, player_hand, score_config))
+
+    @staticmethod
+    def __get_candidate_end_bonus(candidate: Dict[Pos, Tile], player_hand: Optional[List[Tile]],
+                                  score_config: ScoreConfig) -> int:
+        """
+        Gets the end bonus a candidate earns: placing it removes every copy of its tiles from the hand, as
+        GameState.turn_placed does, and an emptied hand ends the game
+        :return: the end bonus points
+        """
+        if player_hand is None:
+            return 0
+        placed_tiles = set(candidate.values())
+        remaining = [tile for tile in player_hand if tile not in placed_tiles]
+        return Rulebook.score_end_bonus_points(remaining, score_config)
+
+    @staticmethod
+    def __get_line_after(given_map: Map, candidate: Dict[Pos, Tile], axis: Axis, position: Pos) -> Segment:
+        """
+        Summarizes the row or col through a candidate position as it would be once the candidate is placed, by
+        joining the candidate's tiles with the map segments next to them
+        :param axis: whether to summarize the row or the col
+        :param position: a position of the candidate
+        :return: the segment the position would belong to
+        """
+        get_segment = given_map.get_row_segment if axis is Axis.ROW else given_map.get_col_segment
+        line = Segment.of_tile(axis, position, candidate[position])
+        for step in (-1, 1):
+            coordinate = (line.start if step < 0 else line.end) + step
+            while True:
+                cell = line.pos_at(coordinate)
+                if cell in candidate:
+                    line = line.join(Segment.of_tile(axis, cell, candidate[cell]))
+                    coordinate += step
+                    continue
+                segment = get_segment(cell)
+                if segment is None:
+                    break
+                line = line.join(segment)
+                coordinate = (segment.start if step < 0 else segment.end) + step
+        return line
 
     @staticmethod
     def score_place_tiles(tiles: Dict[Pos, Tile]) -> int:
@@ -185,12 +419,69 @@ class Rulebook:
         """
         From instructions: A Player receives one point per tile in a contiguous sequence of tiles (in a row or column)
         that contains at least one of its newly placed tiles.
-        :param positions: List of positions played in a given turn
+        :param positions: List of positions played in a given turn, all of which hold a tile on the map
         :return: number of points to be added for this rule
         """
-        row_items = curr_map.get_seen_contiguous_items(curr_map.get_contiguous_row, positions)
-        col_items = curr_map.get_seen_contiguous_items(curr_map.get_contiguous_col, positions)
-        return len(row_items) + len(col_items)
+        return Rulebook.__get_lines_sequence_points(Rulebook.get_affected_lines(curr_map, positions))
+
+    @staticmethod
+    def __get_lines_sequence_points(lines: Dict[Segment, Pos]) -> int:
+        """
+        :param lines: the distinct rows and cols holding the placed tiles
+        :return: one point per tile of each line longer than one tile
+        """
+        return sum(len(segment) for segment in lines if len(segment) > 1)
+
+    @staticmethod
+    def get_completing_q_points(curr_map: Map, positions: List[Pos], score_config: ScoreConfig) -> int:
+        """
+        :param curr_map: Map to check for new q's on
+        :param positions: determines the points for completing some number of q's
+        :return: the points for completing q's
+        """
+        return Rulebook.__get_lines_q_points(curr_map, Rulebook.get_affected_lines(curr_map, positions), score_config)
+
+    @staticmethod
+    def __get_lines_q_points(curr_map: Map, lines: Dict[Segment, Pos], score_config: ScoreConfig) -> int:
+        """
+        :param lines: the distinct rows and cols holding the placed tiles, each with the first placed position in it
+        :return: the points for the q's completed in those lines
+        """
+        return sum(Rulebook.__get_segment_q_points(curr_map, segment, position, score_config)
+                   for segment, position in lines.items())
+
+    @staticmethod
+    def __get_segment_q_points(curr_map: Map, segment: Segment, position: Pos, score_config: ScoreConfig) -> int:
+        """
+        Gets the q points for a segment from its shape and color counts. A segment holding exactly six tiles
+        is a Q when it has all shapes in one color or all colors in one shape. Longer segments that hold every
+        shape or every color are rare and scored tile by tile, the way they always have been.
+        :param segment: the segment to score
+        :param position: the placed position the segment is seen from
+        :return: points to be added
+        """
+        points = Rulebook.__get_counted_q_points(segment, score_config)
+        if points is not None:
+            return points
+        get_contiguous_line = curr_map.get_contiguous_row if segment.axis is Axis.ROW else curr_map.get_contiguous_col
+        return Rulebook.__get_seen_components_points(curr_map, get_contiguous_line(position), score_config)
+
+    @staticmethod
+    def __get_counted_q_points(segment: Segment, score_config: ScoreConfig) -> Optional[int]:
+        """
+        Gets the q points of a segment from its length and its shape and color counts alone
+        :param segment: the segment to score
+        :return: points to be added, or None if the segment has to be scored tile by tile
+        """
+        num_of_shapes = segment.num_of_shapes()
+        num_of_colors = segment.num_of_colors()
+        if num_of_shapes < len(TileShape) and num_of_colors < len(TileColor):
+            return 0
+        if len(segment) == len(TileShape):
+            is_q = (num_of_shapes == len(TileShape) and num_of_colors == 1) or \
+                (num_of_colors == len(TileColor) and num_of_shapes == 1)
+            return score_config.q_bonus if is_q else 0
+        return None
 
     @staticmethod
     def __get_seen_components_points(curr_map: Map, contiguous_positions: Set[Pos], score_config: ScoreConfig) -> int:
@@ -210,28 +501,6 @@ class Rulebook:
                 points += score_config.q_bonus
         return points
 
-    @staticmethod
-    def get_completing_q_points(curr_map: Map, positions: List[Pos], score_config: ScoreConfig) -> int:
-        """
-        :param curr_map: Map to check for new q's on
-        :param positions: determines the points for completing some number of q's
-        :return: the points for completing q's
-        """
-        seen_contiguous = set()
-        points = 0
-
-        for position in positions:
-            contiguous_row = curr_map.get_contiguous_row(position)
-            contiguous_col = curr_map.get_contiguous_col(position)
-            if contiguous_row not in seen_contiguous:
-                points += Rulebook.__get_seen_components_points(curr_map, contiguous_row, score_config)
-                seen_contiguous.add(frozenset(contiguous_row))
-
-            if contiguous_col not in seen_contiguous:
-                points += Rulebook.__get_seen_components_points(curr_map, contiguous_col, score_config)
-                seen_contiguous.add(frozenset(contiguous_col))
-        return points
-
     @staticmethod
     def all_same_row_or_col(tiles: List[Pos]) -> bool:
         """
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ScoreBreakdown:
+    """
+    Represents the points scored on a turn, split by the rule that awarded them
+    placement: one point per tile placed
+    sequence: one point per tile of every row or col of more than one tile holding a placed tile
+    q_bonus: the bonus for every Q completed
+    end_bonus: the bonus for placing all of the tiles in hand, at the end of the game
+    """
+    placement: int = 0
+    sequence: int = 0
+    q_bonus: int = 0
+    end_bonus: int = 0
+
+    def total(self) -> int:
+        """
+        :return: the points scored on the turn
+        """
+        return self.placement + self.sequence + self.q_bonus + self.end_bonus
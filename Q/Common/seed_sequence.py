@@ -0,0 +1,50 @@
+import hashlib
+import random
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass
+class SeedSequence:
+    """
+    Represents a tree of independent random streams grown from one master seed, after NumPy's SeedSequence.
+    Each node is the master seed and the path of child indices leading to it; its state is a hash of both, so
+    children of the same parent, and their children, give unrelated streams. A node's stream depends only on its
+    path, so any game of a tournament can be replayed alone, in any process, from the master seed and its index.
+    entropy: the master seed
+    spawn_key: the child indices from the master seed to this node
+    n_children_spawned: the number of children handed out by spawn so far
+    """
+    entropy: int
+    spawn_key: Tuple[int, ...] = ()
+    n_children_spawned: int = 0
+
+    def generate_state(self) -> int:
+        """
+        :return: the 128-bit seed of this node's stream
+        """
+        digest = hashlib.blake2b(digest_size=16, person=b"Q seed sequence")
+        for number in (self.entropy, len(self.spawn_key)) + self.spawn_key:
+            data = number.to_bytes((number.bit_length() + 8) // 8, "little", signed=True)
+            digest.update(len(data).to_bytes(2, "little") + data)
+        return int.from_bytes(digest.digest(), "little")
+
+    def child(self, index: int) -> "SeedSequence":
+        """
+        Gets a child by its index without spawning it, e.g. to replay one game of a batch
+        """
+        return SeedSequence(self.entropy, self.spawn_key + (index,))
+
+    def spawn(self, n: int) -> List["SeedSequence"]:
+        """
+        Hands out the next n children, which are never handed out again by this node
+        """
+        children = [self.child(index) for index in range(self.n_children_spawned, self.n_children_spawned + n)]
+        self.n_children_spawned += n
+        return children
+
+    def random(self) -> random.Random:
+        """
+        :return: a new random number generator at the start of this node's stream
+        """
+        return random.Random(self.generate_state())
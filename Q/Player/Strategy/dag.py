@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from Q.Common.Board.pos import Pos
 from Q.Common.map import Map
 from Q.Common.Board.tile import Tile
@@ -21,7 +21,7 @@ class Dag(PlayerStrategy):
         """
         return super().get_turn(pub_data, hand)
 
-    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Dict[Pos, Tile] = {}) -> Dict[Pos, Tile]:
+    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Optional[Dict[Pos, Tile]] = None) -> Dict[Pos, Tile]:
         """
         Return a dictionary of positions and tiles to place
         """
@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional, Tuple
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.symmetry import Symmetry
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.zobrist import Zobrist
+from Q.Common.map import Map
+from Q.Common.public_player_data import PublicPlayerData
+from Q.Common.rulebook import Rulebook
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+from Q.Player.Strategy.transposition_table import TranspositionTable
+
+# The solver takes over once the referee's deck is empty and the hand holds at most this many tiles
+ENDGAME_HAND = 3
+MAX_NODES = 3000
+
+
+class NodeLimitReached(Exception):
+    """
+    Raised when an endgame search visits more positions than it may
+    """
+
+
+class EndgameSolver:
+    """
+    Represents a solver of the player's last turns, for when the referee's deck is empty. Nothing more can be
+    drawn, so the tiles in hand are the only ones the player will place and it plans with them exactly. It does not
+    model the opponents' turns, though, and plans as if they placed nothing:
+    a position is worth the most points the hand can still score, placing turn after turn until it is empty (which
+    earns the end bonus) or nothing fits. Solved positions are kept in a transposition table keyed by the board's
+    Zobrist hash and the hand, or by their canonical form if asked: this finds more positions again, but
+    canonicalizing takes time proportional to the board at every position searched.
+    The search grows exponentially with the hand, so the solver only applies to small hands, and a search visiting
+    more than max_nodes placements is abandoned so the caller can fall back on another strategy.
+    """
+
+    def __init__(self, max_hand: int = ENDGAME_HAND, max_nodes: int = MAX_NODES,
+                 table: Optional[TranspositionTable] = None, canonical: bool = False):
+        """
+        :param max_hand: the most tiles the hand may hold for the solver to apply
+        :param max_nodes: the most placements a search may visit
+        :param table: the transposition table of solved positions, a new one by default
+        :param canonical: whether positions are keyed by their canonical form, see Symmetry.canonicalize
+        """
+        self.max_hand = max_hand
+        self.max_nodes = max_nodes
+        self.table = table if table is not None else TranspositionTable()
+        self.canonical = canonical
+        self.nodes = 0
+
+    def applies(self, pub_data: PublicPlayerData, hand: List[Tile]) -> bool:
+        """
+        :return: true if the referee's deck is empty, so no tile can be drawn, and the hand is small enough for
+        the solver to take over
+        """
+        return pub_data.num_ref_tiles == 0 and len(hand) <= self.max_hand
+
+    def solve(self, given_map: Map, hand: List[Tile]) -> Optional[Turn]:
+        """
+        Finds the placement that starts the best plan for the rest of the hand
+        :return: the turn, or None if no tile can be placed or the search was abandoned
+        """
+        self.nodes = 0
+        board = given_map.fork()
+        try:
+            best_value, best_turn = 0, None
+            for placement, points in self.__get_placements(board, hand):
+                value = points + self.__get_value_after(board, hand, placement)
+                if value > best_value:
+                    best_value, best_turn = value, Turn(TurnOutcome.PLACED, placement)
+            return best_turn
+        except NodeLimitReached:
+            return None
+
+    def get_value(self, board: Map, hand: List[Tile]) -> int:
+        """
+        Gets the most points the hand can still score on the board
+        """
+        if not hand:
+            return 0
+        if self.canonical:
+            key, _ = Symmetry.canonicalize(board.tiles, hand, relabel=True)
+        else:
+            key = board.zobrist_hash() ^ Zobrist.digest(bytes(sorted(tile.code() for tile in hand)))
+        value = self.table.get(key)
+        if value is not None:
+            return value
+
+        value = 0
+        for placement, points in self.__get_placements(board, hand):
+            value = max(value, points + self.__get_value_after(board, hand, placement))
+        self.table.put(key, value)
+        return value
+
+    def __get_placements(self, board: Map, hand: List[Tile]) -> List[Tuple[Dict[Pos, Tile], int]]:
+        """
+        Gets every placement of the hand with the points it scores, counting them against the node limit
+        :return: a list of placements and their points
+        """
+        placements = list(Rulebook.generate_placements(board, hand))
+        self.nodes += len(placements)
+        if self.nodes > self.max_nodes:
+            raise NodeLimitReached()
+        scores = Rulebook.score_candidates(board, placements, hand)
+        return [(placement, score.total()) for placement, score in zip(placements, scores)]
+
+    def __get_value_after(self, board: Map, hand: List[Tile], placement: Dict[Pos, Tile]) -> int:
+        """
+        Gets the value of the position a placement leaves. Like GameState.turn_placed, placing a tile removes
+        every copy of it from the hand.
+        """
+        placed_tiles = set(placement.values())
+        rest = [tile for tile in hand if tile not in placed_tiles]
+        if not rest:
+            return 0
+        board.begin()
+        try:
+            board.apply(placement)
+            return self.get_value(board, rest)
+        finally:
+            board.rollback()
@@ -0,0 +1,159 @@
+import math
+import time
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.symmetry import Symmetry
+from Q.Common.Board.tile import Tile, NUM_OF_KINDS
+from Q.Common.game_state import NUM_OF_EACH_KIND
+from Q.Common.map import Map
+from Q.Common.public_player_data import PublicPlayerData
+from Q.Common.rulebook import Rulebook
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+from Q.Player.Strategy.player_strategy import PlayerStrategy
+from Q.Player.Strategy.search_stats import SearchStats
+from Q.Player.Strategy.transposition_table import TranspositionTable
+
+MAX_GENERATED_MOVES = 2000
+BEAM_WIDTH = 8
+# Share of a turn's time budget that generating and scoring candidate moves may use
+GENERATION_FRACTION = 0.25
+# The number of generated placements scored at a time, between checks of the deadline
+SCORING_BATCH = 16
+
+
+class Expectimax(PlayerStrategy):
+    """
+    Represents a deterministic two ply search strategy. The first ply is the player's own move: the beam of best
+    scoring placements from the move generator, and replacing the hand when the referee allows it. The second ply
+    is the next opponent's reply, a chance node over the tile kinds they may hold: for each kind, weighted by how
+    many tiles of it are not on the board, the opponent places it where it scores the most.
+    A move is worth its points minus the expected points of the reply, and the best move is chosen, the higher
+    scoring one on ties and the earlier generated one after that. Reply values only depend on the board, and are
+    the same for boards that are images of each other under a symmetry, so they are kept in a bounded
+    transposition table keyed by the canonical form of the board.
+    Candidates are evaluated best scoring first. With a time budget, the search stops before an evaluation that
+    would likely end past it, and the best candidate evaluated so far is chosen, or the best scoring one if none
+    was.
+    last_stats reports the positions evaluated each turn; their rate is a benchmark of Map and Rulebook.
+    """
+
+    def __init__(self, time_budget: Optional[float] = None, beam_width: int = BEAM_WIDTH,
+                 table: Optional[TranspositionTable] = None, quiet: bool = True):
+        """
+        :param time_budget: the seconds a turn may search for, typically the per_turn limit of the game's
+        RefereeConfig times BUDGET_FRACTION, unlimited by default
+        :param beam_width: the number of best scoring placements searched
+        :param table: the transposition table of reply values, a new one by default
+        :param quiet: if false, the evaluation speed is printed after every turn
+        """
+        self.time_budget = time_budget
+        self.beam_width = beam_width
+        self.table = table if table is not None else TranspositionTable()
+        self.quiet = quiet
+        self.nodes = 0
+        self.last_stats = SearchStats()
+
+    def get_turn(self, pub_data: PublicPlayerData, hand: List[Tile]) -> Turn:
+        """
+        Gets the turn with the most points ahead of the expected reply, among the candidates evaluated before the
+        time budget runs out
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else math.inf
+        self.nodes = 0
+        board = pub_data.current_map.fork()
+        best_turn = Turn(TurnOutcome.PASSED, {})
+        best_key = None
+        candidates = self.get_candidates(pub_data, hand, start + (deadline - start) * GENERATION_FRACTION)
+        evaluated = 0
+        last_seconds = 0.0
+        for rank, (turn, points) in enumerate(candidates):
+            # Evaluations take about as long as the one before, so one that would end past the deadline is skipped
+            evaluation_start = time.perf_counter()
+            if evaluation_start + last_seconds > deadline:
+                break
+            evaluated += 1
+            board.begin()
+            try:
+                board.apply(turn.placements)
+                key = (points - self.get_reply_value(board), points, -rank)
+            finally:
+                board.rollback()
+            last_seconds = time.perf_counter() - evaluation_start
+            if best_key is None or key > best_key:
+                best_turn, best_key = turn, key
+        if best_key is None and candidates:
+            best_turn, evaluated = candidates[0][0], 1
+
+        self.last_stats = SearchStats(self.nodes, time.perf_counter() - start, evaluated)
+        if not self.quiet:
+            print(f"Expectimax: {self.nodes} positions in {self.last_stats.seconds:.2f}s "
+                  f"({self.last_stats.playouts_per_second():.0f} positions/s)")
+        return best_turn
+
+    def get_candidates(self, pub_data: PublicPlayerData, hand: List[Tile], deadline: float = math.inf) \
+            -> List[Tuple[Turn, int]]:
+        """
+        Gets the player's moves worth searching with the points each scores, best scoring first, placements before
+        replacing the hand on ties
+        :param deadline: the time.perf_counter() value after which no more placements are generated and scored
+        """
+        given_map = pub_data.current_map
+        generated = islice(Rulebook.generate_placements(given_map, hand), MAX_GENERATED_MOVES)
+        placements = []
+        scores = []
+        while True:
+            batch = list(islice(generated, SCORING_BATCH))
+            placements.extend(batch)
+            scores.extend(Rulebook.score_candidates(given_map, batch, hand))
+            if len(batch) < SCORING_BATCH or time.perf_counter() > deadline:
+                break
+        self.nodes += len(placements)
+        ranked = sorted(range(len(placements)), key=lambda i: -scores[i].total())
+        candidates = [(Turn(TurnOutcome.PLACED, placements[i]), scores[i].total())
+                      for i in ranked[:self.beam_width]]
+        if Rulebook.valid_replacement(pub_data.num_ref_tiles, hand):
+            # Like GameState.process_turn, a replacement is scored with the hand it leaves, which is empty
+            candidates.append((Turn(TurnOutcome.REPLACED, {}), Rulebook.score_turn({}, given_map, [], end_game=True)))
+        candidates.sort(key=lambda candidate: -candidate[1])
+        return candidates
+
+    def get_reply_value(self, board: Map) -> float:
+        """
+        Gets the points the next opponent is expected to score on the board with their best single tile placement
+        :return: the expected points, 0 if no tile can be placed
+        """
+        key, _ = Symmetry.canonicalize(board.tiles, relabel=True)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+
+        counts = [NUM_OF_EACH_KIND] * NUM_OF_KINDS
+        for tile in board.tiles.values():
+            counts[tile.code()] -= 1
+        expected = 0.0
+        total = 0
+        for code, count in enumerate(counts):
+            if count <= 0:
+                continue
+            tile = Tile.from_code(code)
+            placements = [{slot: tile} for slot in board.get_candidate_slots(tile)]
+            scores = Rulebook.score_candidates(board, placements)
+            self.nodes += len(placements)
+            expected += count * max((score.total() for score in scores), default=0)
+            total += count
+        value = expected / total if total else 0.0
+        self.table.put(key, value)
+        return value
+
+    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Optional[Dict[Pos, Tile]] = None) -> Dict[Pos, Tile]:
+        return super().get_tile_placements(pub_data, hand, placed_so_far)
+
+    def choose_position(self, given_map: Map, tile: Tile) -> Pos:
+        return super().choose_position(given_map, tile)
+
+    def choose_tile(self, given_map: Map, hand: List[Tile]) -> Optional[Tile]:
+        return super().choose_tile(given_map, hand)
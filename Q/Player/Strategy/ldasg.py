@@ -1,7 +1,6 @@
-from Q.Common.rulebook import Rulebook
 from Q.Common import public_player_data
 from Q.Player.Strategy.player_strategy import PlayerStrategy
-from typing import Dict, List
+from typing import Dict, List, Optional
 from Q.Common.Board.pos import Pos
 from Q.Common.map import Map
 from Q.Common.Board.tile import Tile
@@ -23,7 +22,7 @@ class LDasg(PlayerStrategy):
         """
         return super().get_turn(pub_data, hand)
 
-    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Dict[Pos, Tile] = {}) -> Dict[Pos, Tile]:
+    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Optional[Dict[Pos, Tile]] = None) -> Dict[Pos, Tile]:
         return super().get_tile_placements(pub_data, hand, placed_so_far)
 
     def choose_position(self, given_map: Map, tile: Tile) -> Pos:
@@ -32,7 +31,7 @@ class LDasg(PlayerStrategy):
         Tie breaks with the smallest placement (row-col order)
         """
         max_neighbors = 0
-        possible_positions = Rulebook.get_all_positions(given_map, tile)
+        possible_positions = self.legality_cache.get_legal_positions(given_map, tile, [])
         positions_with_most_neighbors = []
         for position in possible_positions:
             neighbors = given_map.get_number_of_tile_neighbors(position)
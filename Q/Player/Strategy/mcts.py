@@ -0,0 +1,294 @@
+import math
+import random
+import time
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.tile import Tile, NUM_OF_KINDS
+from Q.Common.deck import Deck
+from Q.Common.game_state import GameState, NUM_OF_EACH_KIND, MAX_NUM_OF_TILES_IN_PLAYER_HAND
+from Q.Common.map import Map
+from Q.Common.player_game_state import PlayerGameState
+from Q.Common.public_player_data import PublicPlayerData
+from Q.Common.rulebook import Rulebook
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+from Q.Player.Strategy.dag import Dag
+from Q.Player.Strategy.player_strategy import PlayerStrategy
+from Q.Player.Strategy.search_pool import SearchPool
+from Q.Player.Strategy.search_stats import SearchStats
+
+# Share of the referee's per turn time limit spent searching, the rest is left for generating moves and overhead
+BUDGET_FRACTION = 0.5
+# Share of a turn's time budget that generating candidate moves may use
+GENERATION_FRACTION = 0.25
+MAX_GENERATED_MOVES = 2000
+MAX_CANDIDATES = 16
+ROLLOUT_ROUNDS = 2
+EXPLORATION = 10.0
+# Seconds past the deadline the results of the worker processes are waited for
+POOL_GRACE = 0.05
+
+
+@dataclass
+class MctsJob:
+    """
+    Represents the part of a turn's search handed to a worker process, with the board in its compact form
+    """
+    board: bytes
+    candidates: List[Turn]
+    hand: bytes
+    name: str
+    points: int
+    other_points: List[int]
+    num_ref_tiles: int
+    deadline: float
+    max_playouts: Optional[int]
+    rollout_rounds: int
+    exploration: float
+    seed: int
+
+
+class Mcts(PlayerStrategy):
+    """
+    Represents a Monte Carlo tree search strategy, searching the moves of the current turn with UCB1.
+    The candidate moves are the best scoring placements from the move generator, and replacing the hand when the
+    referee allows it. Every playout picks a candidate, deals the tiles the player has not seen at random into the
+    opponents' hands and into a deck of the size the referee reports, plays the candidate and a few rounds of Dag
+    turns for every player, and scores the point difference to the best opponent.
+    The search stops when its time budget runs out and the most played candidate is chosen. last_stats reports
+    how many playouts the turn ran and how fast.
+    With more than one worker, the other workers are processes of a SearchPool that each run an independent search
+    of the same candidates for the same time, and their visits and point totals are added to this process's.
+    """
+
+    def __init__(self, time_budget: float, max_playouts: Optional[int] = None, rollout_rounds: int = ROLLOUT_ROUNDS,
+                 max_candidates: int = MAX_CANDIDATES, exploration: float = EXPLORATION, seed: Optional[int] = None,
+                 quiet: bool = True, workers: int = 1):
+        """
+        :param time_budget: the seconds a turn may search for, typically the per_turn limit of the game's
+        RefereeConfig times BUDGET_FRACTION
+        :param max_playouts: the most playouts a turn may run, unlimited by default
+        :param rollout_rounds: the rounds of Dag turns played after the candidate in each playout
+        :param max_candidates: the number of best scoring placements searched
+        :param exploration: the UCB1 exploration constant, in points
+        :param seed: the seed of the random dealing of hidden tiles
+        :param quiet: if false, the search speed is printed after every turn
+        :param workers: the number of processes searching each turn, this one included
+        """
+        self.time_budget = time_budget
+        self.max_playouts = max_playouts
+        self.rollout_rounds = rollout_rounds
+        self.max_candidates = max_candidates
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.quiet = quiet
+        self.rollout_policy = Dag()
+        self.workers = workers
+        self.pool = SearchPool(workers - 1) if workers > 1 else None
+        self.last_stats = SearchStats()
+
+    def get_turn(self, pub_data: PublicPlayerData, hand: List[Tile]) -> Turn:
+        """
+        Searches the candidate turns until the time budget runs out and returns the most played one
+        """
+        start = time.perf_counter()
+        candidates = self.get_candidate_turns(pub_data, hand, start + self.time_budget * GENERATION_FRACTION)
+        if len(candidates) == 1:
+            self.last_stats = SearchStats(0, time.perf_counter() - start, 1)
+            return candidates[0]
+
+        deadline = start + self.time_budget
+        wall_deadline = time.time() + deadline - time.perf_counter()
+        shares = self.__split_playouts()
+        futures = []
+        if self.pool:
+            futures = self.pool.submit(Mcts.run_job, self.__jobs(pub_data, hand, candidates, wall_deadline, shares[1:]))
+        visits, totals = self.search(pub_data, hand, candidates, deadline, shares[0])
+        for job_visits, job_totals in SearchPool.collect(futures, wall_deadline + POOL_GRACE):
+            visits = [count + job_count for count, job_count in zip(visits, job_visits)]
+            totals = [total + job_total for total, job_total in zip(totals, job_totals)]
+
+        playouts = sum(visits)
+        self.last_stats = SearchStats(playouts, time.perf_counter() - start, len(candidates), self.workers)
+        if not self.quiet:
+            print(f"Mcts: {playouts} playouts in {self.last_stats.seconds:.2f}s on {self.workers} workers "
+                  f"({self.last_stats.playouts_per_second():.0f} playouts/s)")
+        best = max(range(len(candidates)),
+                   key=lambda i: (visits[i], totals[i] / visits[i] if visits[i] else 0.0, -i))
+        return candidates[best]
+
+    def search(self, pub_data: PublicPlayerData, hand: List[Tile], candidates: List[Turn], deadline: float,
+               max_playouts: Optional[int]) -> Tuple[List[int], List[float]]:
+        """
+        Plays the candidates out in this process until the deadline or the playout limit
+        :param deadline: the time.perf_counter() value to stop at
+        :param max_playouts: the most playouts to run, None for no limit
+        :return: the number of playouts and the total points of each candidate
+        """
+        unseen = self.get_unseen_tiles(pub_data.current_map, hand)
+        board = pub_data.current_map.fork()
+        visits = [0] * len(candidates)
+        totals = [0.0] * len(candidates)
+        playouts = 0
+        while time.perf_counter() < deadline and (max_playouts is None or playouts < max_playouts):
+            index = self.__select(visits, totals, playouts)
+            totals[index] += self.__playout(board, candidates[index], pub_data, hand, unseen)
+            visits[index] += 1
+            playouts += 1
+        return visits, totals
+
+    @staticmethod
+    def run_job(job: MctsJob) -> Tuple[List[int], List[float]]:
+        """
+        Runs a search handed to a worker process
+        :return: the number of playouts and the total points of each candidate
+        """
+        deadline = time.perf_counter() + job.deadline - time.time()
+        strategy = Mcts(max(0.0, job.deadline - time.time()), rollout_rounds=job.rollout_rounds,
+                        exploration=job.exploration, seed=job.seed)
+        hand = [Tile.from_code(code) for code in job.hand]
+        pub_data = PublicPlayerData(job.num_ref_tiles, Map.from_bytes(job.board),
+                                    PlayerGameState(job.name, list(hand), job.points), job.other_points)
+        return strategy.search(pub_data, hand, job.candidates, deadline, job.max_playouts)
+
+    def __jobs(self, pub_data: PublicPlayerData, hand: List[Tile], candidates: List[Turn], wall_deadline: float,
+               shares: List[Optional[int]]) -> List[MctsJob]:
+        """
+        Describes the searches of the worker processes. Each gets its own seed drawn from this strategy's random.
+        :param wall_deadline: the time.time() value the workers stop at
+        :param shares: the playout limit of each worker
+        """
+        board = pub_data.current_map.to_bytes()
+        me = pub_data.current_player_data
+        codes = bytes(tile.code() for tile in hand)
+        return [MctsJob(board, candidates, codes, me.name, me.points, list(pub_data.other_points),
+                        pub_data.num_ref_tiles, wall_deadline, share, self.rollout_rounds, self.exploration,
+                        self.random.getrandbits(64)) for share in shares]
+
+    def __split_playouts(self) -> List[Optional[int]]:
+        """
+        Splits the playout limit evenly between the workers, this process first
+        :return: the playout limit of each worker
+        """
+        if self.max_playouts is None:
+            return [None] * self.workers
+        share, rest = divmod(self.max_playouts, self.workers)
+        return [share + (index < rest) for index in range(self.workers)]
+
+    def close(self):
+        """
+        Stops the worker processes, if any
+        """
+        if self.pool:
+            self.pool.close()
+
+    def get_candidate_turns(self, pub_data: PublicPlayerData, hand: List[Tile], deadline: float = math.inf) -> List[Turn]:
+        """
+        Gets the turns worth searching: the best scoring placements, best first, and replacing the hand if allowed.
+        Passing is only a candidate when nothing else is possible.
+        :param deadline: the time.perf_counter() value after which no more placements are generated
+        """
+        given_map = pub_data.current_map
+        placements = []
+        for placement in islice(Rulebook.generate_placements(given_map, hand), MAX_GENERATED_MOVES):
+            placements.append(placement)
+            if time.perf_counter() > deadline:
+                break
+        scores = Rulebook.score_candidates(given_map, placements, hand)
+        ranked = sorted(range(len(placements)), key=lambda i: -scores[i].total())
+        candidates = [Turn(TurnOutcome.PLACED, placements[i]) for i in ranked[:self.max_candidates]]
+        if Rulebook.valid_replacement(pub_data.num_ref_tiles, hand):
+            candidates.append(Turn(TurnOutcome.REPLACED, {}))
+        if not candidates:
+            candidates.append(Turn(TurnOutcome.PASSED, {}))
+        return candidates
+
+    @staticmethod
+    def get_unseen_tiles(given_map: Map, hand: List[Tile]) -> List[Tile]:
+        """
+        Gets the tiles of a full set that are neither on the map nor in the hand. The opponents' hands and the
+        referee deck are made of these.
+        """
+        counts = [NUM_OF_EACH_KIND] * NUM_OF_KINDS
+        for tile in list(given_map.tiles.values()) + hand:
+            counts[tile.code()] -= 1
+        return [Tile.from_code(code) for code, count in enumerate(counts) for _ in range(max(count, 0))]
+
+    def __select(self, visits: List[int], totals: List[float], playouts: int) -> int:
+        """
+        Picks the candidate to play out next by UCB1, trying every candidate once first
+        :return: the index of the candidate
+        """
+        best_index = 0
+        best_value = -math.inf
+        log_playouts = math.log(playouts) if playouts else 0.0
+        for index, (count, total) in enumerate(zip(visits, totals)):
+            if not count:
+                return index
+            value = total / count + self.exploration * math.sqrt(log_playouts / count)
+            if value > best_value:
+                best_index, best_value = index, value
+        return best_index
+
+    def __playout(self, board: Map, candidate: Turn, pub_data: PublicPlayerData, hand: List[Tile],
+                  unseen: List[Tile]) -> float:
+        """
+        Plays the candidate and a few rounds of Dag turns on a random deal of the hidden tiles. The board is rolled
+        back afterwards.
+        :return: the player's points minus the best opponent's points at the end of the playout
+        """
+        state = self.__deal(board, pub_data, hand, unseen)
+        names = [player.name for player in state.players]
+        board.begin()
+        try:
+            self.__play(state, names[0], candidate)
+            for _ in range(self.rollout_rounds):
+                for name in names[1:] + names[:1]:
+                    if state.played_all_tiles() or state.has_all_passed_or_exchanged_for_a_round():
+                        break
+                    player = state.get_player_by_name(name)
+                    rollout_data = PublicPlayerData(len(state.referee_deck), state.map, player, [])
+                    self.__play(state, name, self.rollout_policy.get_turn(rollout_data, list(player.hand)))
+            points = [player.points for player in state.players]
+            return points[0] - max(points[1:], default=0)
+        finally:
+            board.rollback()
+
+    def __deal(self, board: Map, pub_data: PublicPlayerData, hand: List[Tile], unseen: List[Tile]) -> GameState:
+        """
+        Builds a game state consistent with what the player knows: the referee deck gets as many random unseen tiles
+        as the referee holds, and each opponent gets a hand from the rest. The state draws its random numbers from
+        this strategy's random, so playouts are reproducible from the seed.
+        :return: the game state, with the player first and the opponents after it in turn order
+        """
+        pool = list(unseen)
+        self.random.shuffle(pool)
+        deck = pool[:pub_data.num_ref_tiles]
+        del pool[:pub_data.num_ref_tiles]
+        me = pub_data.current_player_data
+        players = [PlayerGameState(me.name, list(hand), me.points)]
+        for index, points in enumerate(pub_data.other_points):
+            opponent_hand = pool[:MAX_NUM_OF_TILES_IN_PLAYER_HAND]
+            del pool[:MAX_NUM_OF_TILES_IN_PLAYER_HAND]
+            players.append(PlayerGameState(f"{me.name}'s opponent {index}", opponent_hand, points))
+        return GameState(tiles=Deck(deck), player_game_states=players, given_map=board, random_seed=self.random)
+
+    @staticmethod
+    def __play(state: GameState, name: str, turn: Turn):
+        """
+        Applies a turn the way the referee does: the state processes it and the player draws new tiles
+        """
+        state.process_turn(turn, name)
+        state.draw_tiles_for_player(name)
+
+    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Optional[Dict[Pos, Tile]] = None) -> Dict[Pos, Tile]:
+        return super().get_tile_placements(pub_data, hand, placed_so_far)
+
+    def choose_position(self, given_map: Map, tile: Tile) -> Pos:
+        return super().choose_position(given_map, tile)
+
+    def choose_tile(self, given_map: Map, hand: List[Tile]) -> Optional[Tile]:
+        return super().choose_tile(given_map, hand)
@@ -0,0 +1,126 @@
+import json
+import random
+from typing import Dict, List, Optional, Tuple
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.symmetry import Symmetry
+from Q.Common.Board.tile import Tile, NUM_OF_KINDS
+from Q.Common.game_state import GameState, NUM_OF_EACH_KIND, MAX_NUM_OF_TILES_IN_PLAYER_HAND
+from Q.Common.map import Map
+from Q.Common.player_game_state import PlayerGameState
+from Q.Common.rulebook import Rulebook
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+from Q.Player.Strategy.player_strategy import PlayerStrategy
+
+# Boards with more tiles than this are not looked up, since openings are short
+MAX_BOOK_TILES = 12
+
+
+class OpeningBook:
+    """
+    Represents a book of precomputed turns for the first positions of games, saved to disk as JSON.
+    Positions are canonicalized before they are looked up, see Symmetry.canonicalize: boards that are rotations,
+    reflections or translations of each other, with the shapes and colors relabeled, share an entry with their
+    hands. Each entry holds the turn chosen in the position, with its placements in the canonical frame.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, dict]] = None, max_tiles: int = 0):
+        """
+        :param entries: the book's turns by position key, as written by save
+        :param max_tiles: the most tiles on the board of any position in the book
+        """
+        self.entries = entries if entries is not None else {}
+        self.max_tiles = max_tiles
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(given_map: Map, hand: List[Tile]) -> Tuple[str, Symmetry]:
+        """
+        Canonicalizes a position
+        :return: the key of the position and the symmetry taking it to its canonical form
+        """
+        key, symmetry = Symmetry.canonicalize(given_map.tiles, hand, relabel=True)
+        return str(key), symmetry
+
+    def lookup(self, given_map: Map, hand: List[Tile]) -> Optional[Turn]:
+        """
+        Gets the book's turn for a position
+        :return: the turn moved back onto the given board, or None if the position is not in the book
+        """
+        if not given_map.tiles or len(given_map.tiles) > self.max_tiles:
+            return None
+        key, symmetry = self.get_key(given_map, hand)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        placements = symmetry.invert_placements({Pos(x, y): Tile.from_code(code)
+                                                 for x, y, code in entry["placements"]})
+        turn = Turn(TurnOutcome(entry["outcome"]), placements)
+        if turn.turn_outcome is TurnOutcome.PLACED and not Rulebook.valid_placements(given_map, placements):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return turn
+
+    def add(self, given_map: Map, hand: List[Tile], turn: Turn):
+        """
+        Records the turn to play in a position, replacing any turn recorded for it before
+        """
+        key, symmetry = self.get_key(given_map, hand)
+        placements = [[pos.x, pos.y, tile.code()] for pos, tile in symmetry.apply_placements(turn.placements).items()]
+        self.entries[key] = {"outcome": turn.turn_outcome.value, "placements": placements}
+        self.max_tiles = max(self.max_tiles, len(given_map.tiles))
+
+    def save(self, path: str):
+        """
+        Writes the book to a JSON file
+        """
+        with open(path, "w") as file:
+            json.dump({"max_tiles": self.max_tiles, "entries": self.entries}, file)
+
+    @staticmethod
+    def load(path: str) -> "OpeningBook":
+        """
+        Reads a book written by save
+        """
+        with open(path) as file:
+            data = json.load(file)
+        return OpeningBook(data["entries"], data["max_tiles"])
+
+    @staticmethod
+    def generate(strategy: PlayerStrategy, games: int, plies: int, num_of_players: int = 2, seed: int = 0,
+                 max_tiles: int = MAX_BOOK_TILES) -> "OpeningBook":
+        """
+        Builds a book by playing the first turns of random games with the given strategy for every player and
+        recording each turn it chose
+        :param games: the number of games to play
+        :param plies: the number of turns played in each game, counting every player's
+        :param seed: the seed of the random decks
+        :param max_tiles: positions with more tiles on the board are not recorded
+        :return: the book
+        """
+        book = OpeningBook()
+        rng = random.Random(seed)
+        full_set = [Tile.from_code(code) for code in range(NUM_OF_KINDS) for _ in range(NUM_OF_EACH_KIND)]
+        for _ in range(games):
+            deck = list(full_set)
+            rng.shuffle(deck)
+            players = []
+            for index in range(num_of_players):
+                players.append(PlayerGameState(f"player {index}", deck[:MAX_NUM_OF_TILES_IN_PLAYER_HAND], 0))
+                del deck[:MAX_NUM_OF_TILES_IN_PLAYER_HAND]
+            state = GameState(tiles=deck, player_game_states=players, given_map=Map())
+            state.place_ref_tile()
+            for ply in range(plies):
+                if len(state.map.tiles) > max_tiles or state.played_all_tiles():
+                    break
+                player = players[ply % num_of_players]
+                pub_data = state.extract_public_player_data(player.name)
+                turn = strategy.get_turn(pub_data, list(player.hand))
+                book.add(state.map, player.hand, turn)
+                state.process_turn(turn, player.name)
+                state.draw_tiles_for_player(player.name)
+        return book
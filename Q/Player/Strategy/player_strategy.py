@@ -4,6 +4,7 @@ from Q import Util
 from Q.Common.Board.pos import Pos
 from Q.Common.Board.tile import Tile
 from Q.Common.map import Map
+from Q.Common.legality_cache import LegalityCache
 from Q.Common.rulebook import Rulebook
 from Q.Player.Strategy.strategy import Strategy
 from Q.Common.public_player_data import PublicPlayerData
@@ -14,38 +15,52 @@ from Q.Common.Turn.turn_outcome import TurnOutcome
 class PlayerStrategy(Strategy, ABC):
     """
     Represents a strategy that a well behaving player would employ
+    Legal positions are looked up in a cache shared by every strategy, since players keep asking where the same
+    tiles can go on the same boards.
     """
+    legality_cache = LegalityCache()
+
     def get_turn(self, pub_data: PublicPlayerData, hand: List[Tile]) -> Turn:
         """
         Gets the turn object depending on the current public player data
+        The placements are planned on the given map and rolled back once chosen.
         """
-        if Rulebook.get_legal_hand(pub_data.current_map, hand, []):
-            return Turn(TurnOutcome.PLACED, self.get_tile_placements(pub_data, hand, {}))
+        if self.legality_cache.get_legal_hand(pub_data.current_map, hand, []):
+            pub_data.current_map.begin()
+            try:
+                return Turn(TurnOutcome.PLACED, self.get_tile_placements(pub_data, hand))
+            finally:
+                pub_data.current_map.rollback()
         if pub_data.num_ref_tiles < len(hand):
             return Turn(TurnOutcome.PASSED, {})
         return Turn(TurnOutcome.REPLACED, {})
 
     @abstractmethod
-    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Dict[Pos, Tile] = {}) -> Dict[Pos, Tile]:
+    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Optional[Dict[Pos, Tile]] = None) -> Dict[Pos, Tile]:
         """
         Return a dictionary of positions and tiles to place
+        Tiles are placed greedily one at a time: the chosen tile goes to the chosen position as long as that position
+        is in line with the tiles placed so far. The map keeps its legal slots up to date after each placement.
         """
-        tile = self.choose_tile(pub_data.current_map, hand)
-        if tile:
-            position_to_place_tile = self.choose_position(pub_data.current_map, tile)
-            if position_to_place_tile in Rulebook.get_legal_positions(pub_data.current_map, tile, list(placed_so_far.keys())):
-                pub_data.current_map.add_tile_to_board(tile, position_to_place_tile)
-                placed_so_far.update({position_to_place_tile: tile})
-                hand.remove(tile)
-                return self.get_tile_placements(pub_data, hand, placed_so_far)
-        return placed_so_far
+        placed_so_far = {} if placed_so_far is None else placed_so_far
+        given_map = pub_data.current_map
+        while True:
+            tile = self.choose_tile(given_map, hand)
+            if not tile:
+                return placed_so_far
+            position_to_place_tile = self.choose_position(given_map, tile)
+            if not Rulebook.in_line_with(list(placed_so_far))(position_to_place_tile):
+                return placed_so_far
+            given_map.add_tile_to_board(tile, position_to_place_tile)
+            placed_so_far[position_to_place_tile] = tile
+            hand.remove(tile)
 
     @abstractmethod
     def choose_position(self, given_map: Map, tile: Tile) -> Pos:
         """
         Get the position that a tile should be placed at
         """
-        possible_positions = Rulebook.get_all_positions(given_map, tile)
+        possible_positions = self.legality_cache.get_legal_positions(given_map, tile, [])
         return self.get_smallest_placement(list(possible_positions))
 
     @abstractmethod
@@ -53,7 +68,7 @@ class PlayerStrategy(Strategy, ABC):
         """
         Get the tile that should be placed
         """
-        filtered_hand = Rulebook.get_legal_hand(given_map, hand, [])
+        filtered_hand = self.legality_cache.get_legal_hand(given_map, hand, [])
         smallest_tile = None
         if filtered_hand:
             smallest_shape_rank = min([tile.shape.value for tile in filtered_hand])
@@ -68,8 +83,5 @@ class PlayerStrategy(Strategy, ABC):
         """
         Chooses smallest placement by row-column order
         """
-        smallest_row = min([position.y for position in possible_positions])
-        positions_with_smallest_row = [position for position in possible_positions if position.y == smallest_row]
-
-        return min(positions_with_smallest_row, key=lambda position: position.x)
+        return min(possible_positions, key=lambda position: (position.y, position.x))
     
\ No newline at end of file
@@ -0,0 +1,55 @@
+from typing import Dict, List, Optional
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.tile import Tile
+from Q.Common.map import Map
+from Q.Common.public_player_data import PublicPlayerData
+from Q.Common.rulebook import Rulebook
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+from Q.Player.Strategy.endgame_solver import EndgameSolver
+from Q.Player.Strategy.opening_book import OpeningBook
+from Q.Player.Strategy.player_strategy import PlayerStrategy
+
+
+class PreparedStrategy(PlayerStrategy):
+    """
+    Represents a strategy that plays from an opening book at the start of the game and with an endgame solver at
+    its end, and asks another strategy, typically a search, for every other turn
+    """
+
+    def __init__(self, strategy: PlayerStrategy, book: Optional[OpeningBook] = None,
+                 endgame: Optional[EndgameSolver] = None):
+        """
+        :param strategy: the strategy used when neither the book nor the solver has a turn
+        :param book: the opening book, none by default
+        :param endgame: the endgame solver, none by default
+        """
+        self.strategy = strategy
+        self.book = book
+        self.endgame = endgame
+
+    def get_turn(self, pub_data: PublicPlayerData, hand: List[Tile]) -> Turn:
+        """
+        Gets the book's turn if the position is in it, else the solver's turn if the game is nearly over, else the
+        other strategy's turn
+        """
+        if self.book:
+            turn = self.book.lookup(pub_data.current_map, hand)
+            if turn and (turn.turn_outcome is not TurnOutcome.REPLACED
+                         or Rulebook.valid_replacement(pub_data.num_ref_tiles, hand)):
+                return turn
+        if self.endgame and self.endgame.applies(pub_data, hand):
+            turn = self.endgame.solve(pub_data.current_map, hand)
+            if turn:
+                return turn
+        return self.strategy.get_turn(pub_data, hand)
+
+    def get_tile_placements(self, pub_data: PublicPlayerData, hand: List[Tile], placed_so_far: Optional[Dict[Pos, Tile]] = None) -> Dict[Pos, Tile]:
+        return self.strategy.get_tile_placements(pub_data, hand, placed_so_far)
+
+    def choose_position(self, given_map: Map, tile: Tile) -> Pos:
+        return self.strategy.choose_position(given_map, tile)
+
+    def choose_tile(self, given_map: Map, hand: List[Tile]) -> Optional[Tile]:
+        return self.strategy.choose_tile(given_map, hand)
@@ -0,0 +1,51 @@
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, List, Optional
+
+
+class SearchPool:
+    """
+    Represents a persistent pool of worker processes that search strategies hand parts of their search to. Python
+    threads share one interpreter lock, so only separate processes search in parallel. The processes are started
+    with the first job and kept for the following turns, so a turn only pays for sending its jobs, which should be
+    small: boards are sent as Map.to_bytes.
+    """
+
+    def __init__(self, workers: int):
+        """
+        :param workers: the number of worker processes
+        """
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, function: Callable[[Any], Any], jobs: List[Any]) -> List[Future]:
+        """
+        Starts running the function on each job in the worker processes
+        :param function: a module level function or static method, so that it can be sent to the workers
+        :param jobs: the argument of each call
+        :return: the futures of the calls, to be collected
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        return [self.executor.submit(function, job) for job in jobs]
+
+    @staticmethod
+    def collect(futures: List[Future], deadline: float) -> List[Any]:
+        """
+        Waits for the submitted calls until the deadline. Calls that have not finished by then are dropped.
+        :param futures: the futures returned by submit
+        :param deadline: the time.time() value to wait until at most
+        :return: the results of the calls that finished, in submission order
+        """
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.time()))
+        for future in not_done:
+            future.cancel()
+        return [future.result() for future in futures if future in done]
+
+    def close(self):
+        """
+        Stops the worker processes. The pool starts new ones if it is used again.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
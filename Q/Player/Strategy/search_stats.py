@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class SearchStats:
+    """
+    Represents how much work a search strategy did for one turn
+    playouts: the number of simulated games (or evaluated positions) completed
+    seconds: the wall clock time the search took
+    candidates: the number of moves the search chose between
+    workers: the number of processes the search ran on
+    """
+    playouts: int = 0
+    seconds: float = 0.0
+    candidates: int = 0
+    workers: int = 1
+
+    def playouts_per_second(self) -> float:
+        """
+        :return: the search speed, 0 if no time was measured
+        """
+        return self.playouts / self.seconds if self.seconds > 0 else 0.0
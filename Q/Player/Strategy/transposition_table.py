@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_MAX_SIZE = 1 << 16
+
+
+class TranspositionTable:
+    """
+    Represents a bounded LRU table of the values search strategies computed for positions, keyed by a 64-bit
+    position hash such as Map.zobrist_hash. Positions reached through different moves share their entry.
+    hits and misses count how lookups were answered.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param max_size: the number of entries kept before the least recently used ones are evicted
+        """
+        self.max_size = max_size
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Optional[float]:
+        """
+        :return: the value stored for the position, or None if there is none
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: int, value: float):
+        """
+        Stores the value of the position, evicting the least recently used entry if the table is full
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
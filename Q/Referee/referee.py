@@ -1,5 +1,7 @@
+import concurrent.futures
+import time
 import traceback
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from threading import Thread, Lock
 from typing import List, Set, Optional, Callable, Dict
 from Q.Common.Board.tile import Tile
@@ -13,6 +15,7 @@ from Q.Player.behaved_player import Player
 from Q.Referee.observer import Observer
 from Q.Referee.referee_data import RefereeData
 
+from Q.Util.Configurations.call_mode import CallMode
 from Q.Util.Configurations.referee_config import RefereeConfig
 
 
@@ -44,31 +47,35 @@ class Referee:
         """
         if ref_data.config.observe:
             observer = Observer()
-            observer.receive_a_state(deepcopy(ref_data.game_state))
+            observer.receive_a_state(ref_data.game_state.snapshot())
         else:
             observer = None
 
         while not Referee.is_game_over(ref_data):
             try:
-                current_player = ref_data.player_queue.pop(0)
+                current_player = ref_data.player_queue.popleft()
+                ref_data.turns += 1
                 player_name = current_player.name()
                 pub_data = ref_data.game_state.extract_public_player_data(player_name)
+                num_ref_tiles = pub_data.num_ref_tiles
                 try:
                     turn = Referee.run_method_with_time_limit(ref_data, current_player.take_turn, args=[pub_data])
                 except Exception as e:
                     if not ref_data.config.quiet:
                         print(e)
-                    Referee.remove_current_player(ref_data, current_player)
+                    Referee.eject_player(ref_data, current_player)
                     continue
+                # Once the player's fork of the map is dropped, the turn is placed on the referee's map in place
+                del pub_data
 
-                if Referee.is_valid_move(turn, deepcopy(ref_data.game_state.map), ref_data.game_state.get_active_player(current_player.name()), pub_data.num_ref_tiles):
+                if Referee.is_valid_move(turn, ref_data.game_state.map, ref_data.game_state.get_active_player(current_player.name()), num_ref_tiles):
                     Referee.handle_turn(turn, current_player, ref_data)
                     new_tiles = ref_data.game_state.draw_tiles_for_player(player_name)
                     Referee.send_player_tiles(new_tiles, current_player, ref_data)
                     if ref_data.config.observe:
-                        observer.receive_a_state(deepcopy(ref_data.game_state))
+                        observer.receive_a_state(ref_data.game_state.snapshot())
                 else:
-                    Referee.remove_current_player(ref_data, current_player)
+                    Referee.eject_player(ref_data, current_player)
                     continue
 
                 ref_data.player_queue.append(current_player)
@@ -76,18 +83,38 @@ class Referee:
                 print(e)
                 print(traceback.format_exc())
         Referee.end_game(ref_data, observer=observer)
+        if ref_data.executor is not None:
+            ref_data.executor.shutdown(wait=False)
+            ref_data.executor = None
         return Referee.get_pair_of_results(ref_data)
 
     @staticmethod
     def run_method_with_time_limit(ref_data: RefereeData, method: Callable, args=[]) -> any:
         """
         Waits for a given amount of seconds for a method to complete. If the thread is still alive after 6 seconds
-        a TimeoutError is thrown.
+        a TimeoutError is thrown. Methods of trusted players are called as the config's call mode says instead, see
+        CallMode. If the method raises, the exception is printed and None is returned.
         :param method: method to be called
         :param ref_data: dataclass with configurable information
         :param args: args to be passed into the method
         :return: whatever the method returns
         """
+        call_mode = Referee.get_call_mode(ref_data, method)
+        if call_mode is CallMode.DIRECT:
+            start = time.perf_counter()
+            result = Referee.call_method(method, args)
+            if time.perf_counter() - start > ref_data.config.per_turn:
+                raise TimeoutError
+            return result
+        if call_mode is CallMode.POOL:
+            if ref_data.executor is None:
+                ref_data.executor = ThreadPoolExecutor(max(1, len(ref_data.player_queue) + 1))
+            future = ref_data.executor.submit(Referee.call_method, method, args)
+            try:
+                return future.result(ref_data.config.per_turn)
+            except concurrent.futures.TimeoutError:
+                raise TimeoutError
+
         result_container = []
         lock = Lock()
 
@@ -113,6 +140,29 @@ class Referee:
             if result_container:
                 return result_container[0]
 
+    @staticmethod
+    def get_call_mode(ref_data: RefereeData, method: Callable) -> CallMode:
+        """
+        Gets how to call a player method: with the config's call mode if the player is trusted, else in a thread
+        :param method: a method bound to a player
+        """
+        player = getattr(method, "__self__", None)
+        if ref_data.config.trusted and isinstance(player, Player) and player.name() in ref_data.config.trusted:
+            return ref_data.config.call_mode
+        return CallMode.THREAD
+
+    @staticmethod
+    def call_method(method: Callable, args: List) -> any:
+        """
+        Calls a player method, printing the exception it raises if any
+        :return: whatever the method returns, None if it raised
+        """
+        try:
+            return method(*args)
+        except Exception as e:
+            print(e)
+            print(traceback.format_exc())
+
     @staticmethod
     def is_game_over(ref_data: RefereeData):
         """
@@ -130,7 +180,7 @@ class Referee:
         :param winner_names: the names of the winners of the game
         :param ref_data: datat the referee needs to know
         """
-        for player in ref_data.player_queue:
+        for player in list(ref_data.player_queue):
             try:
                 if player.name() in winner_names:
                     Referee.run_method_with_time_limit(ref_data, player.win, args=[True])
@@ -192,7 +242,7 @@ class Referee:
         Starts the game with the given players and some given game
         :param ref_data: Data pertaining to the referee
         """
-        for player in ref_data.player_queue:
+        for player in list(ref_data.player_queue):
             hand = ref_data.game_state.draw_tiles(6)
             player_game_state = PlayerGameState(name=player.name(), hand=hand, points=0)
             ref_data.game_state.signup_player(player_game_state)
@@ -233,10 +283,19 @@ class Referee:
                 print(f"Exception occurred in setup_players: {e}")
             Referee.remove_current_player(ref_data, player)
 
+    @staticmethod
+    def eject_player(ref_data: RefereeData, misbehaved_player: Player):
+        """
+        Ejects the player whose turn it is. They were taken off the front of the queue for their turn and are
+        simply not put back, so this takes constant time. Their tiles are not returned to the referee.
+        """
+        ref_data.misbehaved.append(misbehaved_player)
+
     @staticmethod
     def remove_current_player(ref_data: RefereeData, misbehaved_player: Player):
         """
-        NOTE: may need to call continue ofter this function to not add the player back to the queue
+        Ejects a player still waiting in the queue, e.g. one that failed to set up, and returns their tiles to the
+        referee. The player whose turn it is is ejected with eject_player instead.
         """
         ref_data.misbehaved.append(misbehaved_player)
         ref_data.player_queue.remove(misbehaved_player)
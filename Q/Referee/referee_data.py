@@ -1,5 +1,7 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List
+from typing import Deque, List, Optional
 from Q.Common.game_state import GameState
 from Q.Player.base import Player
 from Q.Util.Configurations.referee_config import RefereeConfig
@@ -9,8 +11,17 @@ from Q.Util.Configurations.referee_config import RefereeConfig
 class RefereeData:
     """
     Information pertaining to the referee
+    player_queue: the players still in the game in turn order, given as any sequence and kept as a deque so that
+    turns rotate in constant time
+    turns: the number of turns the players have been asked for so far
+    executor: the threads calling trusted players in CallMode.POOL, started with the first such call
     """
-    player_queue: List[Player]
+    player_queue: Deque[Player]
     game_state: GameState
     misbehaved: List[Player]
     config: RefereeConfig = field(default_factory=RefereeConfig)
+    turns: int = 0
+    executor: Optional[ThreadPoolExecutor] = None
+
+    def __post_init__(self):
+        self.player_queue = deque(self.player_queue)
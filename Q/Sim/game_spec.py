@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List
+
+from Q.Common.game_state import NUM_OF_Q_TILES
+from Q.Common.seed_sequence import SeedSequence
+from Q.Player.Strategy.dag import Dag
+from Q.Player.Strategy.expectimax import Expectimax
+from Q.Player.Strategy.ldasg import LDasg
+from Q.Player.Strategy.mcts import BUDGET_FRACTION, Mcts
+from Q.Player.Strategy.player_strategy import PlayerStrategy
+from Q.Util.Configurations.call_mode import CallMode
+from Q.Util.Configurations.referee_config import RefereeConfig
+
+# The strategies a game spec may name, each built from the spec, so that it can fit the game's time limit, and a
+# seed for the strategy's own random numbers
+STRATEGIES: Dict[str, Callable[["GameSpec", int], PlayerStrategy]] = {
+    "dag": lambda spec, seed: Dag(),
+    "ldasg": lambda spec, seed: LDasg(),
+    "expectimax": lambda spec, seed: Expectimax(spec.per_turn * BUDGET_FRACTION),
+    "mcts": lambda spec, seed: Mcts(spec.per_turn * BUDGET_FRACTION, seed=seed),
+}
+
+
+@dataclass
+class GameSpec:
+    """
+    Represents one game of a batch: who plays it and how it is dealt. Specs are sent to worker processes, so they
+    hold names and numbers rather than players and states, which are built in the worker.
+    strategies: the name of each player's strategy in turn order, see STRATEGIES
+    seed: the seed of the game; the referee deck is dealt from it and the strategy of player i is seeded by its
+    child i, so the game can be replayed from the spec alone
+    per_turn: the seconds a player has for each call, as in RefereeConfig
+    tiles: the number of tiles in the referee deck, the top of the full shuffled set
+    call_mode: how the referee calls the players, which are all trusted since they are built from STRATEGIES
+    """
+    strategies: List[str]
+    seed: SeedSequence
+    per_turn: float = RefereeConfig.per_turn
+    tiles: int = NUM_OF_Q_TILES
+    call_mode: CallMode = CallMode.DIRECT
+
+    def names(self) -> List[str]:
+        """
+        :return: the name of each player, which are unique
+        """
+        return [f"player{index}" for index in range(len(self.strategies))]
+
+    @staticmethod
+    def batch(strategies: List[str], games: int, master_seed: int, per_turn: float = RefereeConfig.per_turn,
+              tiles: int = NUM_OF_Q_TILES, call_mode: CallMode = CallMode.DIRECT) -> Iterator["GameSpec"]:
+        """
+        Builds the specs of games between the same strategies one at a time, game i seeded by child i of the
+        master seed
+        """
+        master = SeedSequence(master_seed)
+        for index in range(games):
+            yield GameSpec(list(strategies), master.child(index), per_turn, tiles, call_mode)
+
+
+@dataclass
+class GameResult:
+    """
+    Represents the outcome of a simulated game
+    index: the position of the game's spec in the batch
+    seed: the master seed and the spawn key of the game's seed
+    winners, misbehaved: the names of the players as in PairResults
+    scores: the points of each player
+    turns: the number of turns the players were asked for
+    seconds: the time the game took in its worker
+    """
+    index: int
+    seed: List[int]
+    strategies: List[str]
+    winners: List[str]
+    misbehaved: List[str]
+    scores: Dict[str, int] = field(default_factory=dict)
+    turns: int = 0
+    seconds: float = 0.0
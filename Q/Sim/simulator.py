@@ -0,0 +1,134 @@
+import argparse
+import contextlib
+import dataclasses
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, Set, TextIO, Tuple
+
+from Q.Common.game_state import GameState, NUM_OF_Q_TILES
+from Q.Common.map import Map
+from Q.Player.behaved_player import Player
+from Q.Referee.referee import Referee
+from Q.Referee.referee_data import RefereeData
+from Q.Sim.game_spec import GameResult, GameSpec, STRATEGIES
+from Q.Util.Configurations.call_mode import CallMode
+from Q.Util.Configurations.referee_config import RefereeConfig
+
+# The number of games sent to the workers ahead of the results read, per worker
+GAMES_IN_FLIGHT = 4
+
+
+class Simulator:
+    """
+    Represents a headless runner of batches of games. Games run to completion in a pool of worker processes,
+    since Python threads share one interpreter lock, and results are yielded as games finish, so a batch of any
+    size is streamed in constant memory: only a few games per worker are sent ahead of the results read.
+    """
+
+    def __init__(self, workers: int = os.cpu_count() or 1):
+        """
+        :param workers: the number of worker processes; with 1 the games run one after another in this process
+        """
+        self.workers = workers
+
+    def run(self, specs: Iterable[GameSpec]) -> Iterator[GameResult]:
+        """
+        Plays the games of the specs
+        :return: the result of each game, in the order the games finish
+        """
+        if self.workers <= 1:
+            for index, spec in enumerate(specs):
+                yield Simulator.play((index, spec))
+            return
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            pending: Set[Future] = set()
+            for index, spec in enumerate(specs):
+                pending.add(executor.submit(Simulator.play, (index, spec)))
+                if len(pending) >= self.workers * GAMES_IN_FLIGHT:
+                    yield from Simulator.__collect(pending)
+            while pending:
+                yield from Simulator.__collect(pending)
+
+    @staticmethod
+    def __collect(pending: Set[Future]) -> Iterator[GameResult]:
+        """
+        Waits for at least one pending game to finish
+        :return: the results of the finished games, which are no longer pending
+        """
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        pending -= done
+        for future in done:
+            yield future.result()
+
+    @staticmethod
+    def play(job: Tuple[int, GameSpec]) -> GameResult:
+        """
+        Plays one game the way Referee.main does, with a state dealt from the spec's seed. What the players print
+        is dropped, so that it does not mix with results written to standard out.
+        :param job: the index of the spec in its batch and the spec
+        :return: the result of the game
+        """
+        index, spec = job
+        start = time.perf_counter()
+        names = spec.names()
+        players = [Player(name, STRATEGIES[strategy](spec, spec.seed.child(rank).generate_state()), [])
+                   for rank, (name, strategy) in enumerate(zip(names, spec.strategies))]
+        game_state = GameState(player_game_states=[], given_map=Map(), random_seed=spec.seed)
+        game_state.referee_deck = game_state.referee_deck[:spec.tiles]
+        config = RefereeConfig(state0=game_state, per_turn=spec.per_turn, call_mode=spec.call_mode,
+                               trusted=set(names))
+        game_state.setup_state()
+        ref_data = RefereeData(players, game_state, misbehaved=[], config=config)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            Referee.signup_players(ref_data)
+            results = Referee.run_game(ref_data)
+        return GameResult(index, [spec.seed.entropy, *spec.seed.spawn_key], list(spec.strategies),
+                          sorted(results.winners), results.misbehaved, game_state.get_scores(), ref_data.turns,
+                          time.perf_counter() - start)
+
+    @staticmethod
+    def write_jsonl(results: Iterable[GameResult], file: TextIO) -> int:
+        """
+        Writes each result as a line of JSON as soon as it is available
+        :return: the number of results written
+        """
+        count = 0
+        for result in results:
+            file.write(json.dumps(dataclasses.asdict(result)) + "\n")
+            file.flush()
+            count += 1
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plays a batch of Q games and writes their results as JSON lines")
+    parser.add_argument("strategies", nargs="+", choices=sorted(STRATEGIES), help="each player's strategy")
+    parser.add_argument("--games", type=int, default=100, help="the number of games")
+    parser.add_argument("--seed", type=int, default=0, help="the master seed of the batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="the number of worker processes")
+    parser.add_argument("--tiles", type=int, default=NUM_OF_Q_TILES, help="the number of tiles in the deck")
+    parser.add_argument("--per-turn", type=float, default=RefereeConfig.per_turn, help="the seconds per player call")
+    parser.add_argument("--call-mode", type=CallMode, default=CallMode.DIRECT, choices=list(CallMode),
+                        help="how the referee calls the players")
+    parser.add_argument("--out", help="the file to write to, standard out by default")
+    args = parser.parse_args()
+
+    specs = GameSpec.batch(args.strategies, args.games, args.seed, args.per_turn, args.tiles,
+                           args.call_mode)
+    results = Simulator(args.workers).run(specs)
+    start = time.perf_counter()
+    if args.out:
+        with open(args.out, "w") as file:
+            count = Simulator.write_jsonl(results, file)
+    else:
+        count = Simulator.write_jsonl(results, sys.stdout)
+    seconds = time.perf_counter() - start
+    print(f"{count} games in {seconds:.1f}s ({count / seconds:.1f} games/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
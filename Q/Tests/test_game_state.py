@@ -0,0 +1,118 @@
+import random
+import unittest
+
+from Q.Common.Board.tile_color import TileColor
+from Q.Common.Board.tile_shape import TileShape
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.pos import Pos
+from Q.Common.deck import Deck
+from Q.Common.game_state import GameState
+from Q.Common.map import Map
+from Q.Common.player_game_state import PlayerGameState
+from Q.Common.seed_sequence import SeedSequence
+
+
+class TestGameState(unittest.TestCase):
+    def setUp(self):
+        self.tile1 = Tile(TileShape.CIRCLE, TileColor.BLUE)
+        self.tile2 = Tile(TileShape.STAR, TileColor.BLUE)
+        self.tile3 = Tile(TileShape.CLOVER, TileColor.GREEN)
+
+    def create_state(self) -> GameState:
+        players = [PlayerGameState("bob", [self.tile1, self.tile2], 3), PlayerGameState("alice", [self.tile3], 5)]
+        return GameState(tiles=[self.tile3, self.tile1], player_game_states=players,
+                         given_map=Map(config={Pos(0, 0): self.tile1}))
+
+    def test_zobrist_hash_of_equal_states(self):
+        state = self.create_state()
+        self.assertEqual(state.zobrist_hash(), self.create_state().zobrist_hash())
+        self.assertEqual(state.zobrist_hash(), state.snapshot().zobrist_hash())
+
+    def test_zobrist_hash_changes_with_state(self):
+        initial = self.create_state().zobrist_hash()
+        state = self.create_state()
+        state.players[0].points += 1
+        self.assertNotEqual(state.zobrist_hash(), initial)
+
+        state = self.create_state()
+        state.referee_deck.reverse()
+        self.assertNotEqual(state.zobrist_hash(), initial)
+
+        state = self.create_state()
+        state.place_tiles({Pos(1, 0): self.tile2})
+        self.assertNotEqual(state.zobrist_hash(), initial)
+
+    def test_players_are_indexed_by_name(self):
+        state = self.create_state()
+        self.assertIs(state.get_player_by_name("alice"), state.players[1])
+        self.assertIs(state.get_active_player("bob"), state.players[0])
+        self.assertIsNone(state.get_player_by_name("carol"))
+
+        carol = PlayerGameState("carol", [], 0)
+        state.signup_player(carol)
+        self.assertIs(state.get_player_by_name("carol"), carol)
+
+        dave = PlayerGameState("dave", [], 0)
+        state.players.append(dave)
+        self.assertIs(state.get_player_by_name("dave"), dave)
+
+        state.players = [PlayerGameState("bob", [], 7)]
+        self.assertEqual(state.get_player_by_name("bob").points, 7)
+        self.assertIsNone(state.get_player_by_name("alice"))
+
+    def test_snapshot_indexes_its_own_players(self):
+        state = self.create_state()
+        snapshot = state.snapshot()
+        snapshot.get_player_by_name("bob").points += 10
+        self.assertEqual(state.get_player_by_name("bob").points, 3)
+        self.assertEqual(snapshot.get_player_by_name("bob").points, 13)
+
+    def test_deck_draws_from_the_top_and_returns_to_the_bottom(self):
+        tiles = [Tile.from_code(code % 36) for code in range(1000)]
+        deck = Deck(tiles)
+        drawn = []
+        for _ in range(150):
+            drawn += deck.draw(6)
+        self.assertEqual(drawn, tiles[:900])
+        deck.extend([self.tile1, self.tile2])
+        self.assertEqual(len(deck), 102)
+        self.assertEqual(list(deck), tiles[900:] + [self.tile1, self.tile2])
+        self.assertEqual((deck[0], deck[-1], deck[1:3]), (tiles[900], self.tile2, tiles[901:903]))
+        self.assertEqual(Deck.from_bytes(deck.to_bytes()), deck)
+        self.assertEqual(deck.draw(200), tiles[900:] + [self.tile1, self.tile2])
+        self.assertEqual(len(deck), 0)
+
+    def test_state_keeps_the_rule_for_short_decks(self):
+        state = self.create_state()
+        self.assertIsInstance(state.referee_deck, Deck)
+        self.assertEqual(state.draw_tiles(3), [])
+        self.assertEqual(state.draw_tiles(2), [self.tile3, self.tile1])
+
+    def test_seeded_decks_are_reproducible(self):
+        state = self.create_state()
+        deck = state.create_randomize_deck(1080, 7)
+        self.assertEqual(deck, state.create_randomize_deck(1080, 7))
+        self.assertNotEqual(deck, state.create_randomize_deck(1080, 8))
+        self.assertEqual(sorted(tile.code() for tile in deck), [code for code in range(36) for _ in range(30)])
+        self.assertEqual(list(state.create_randomize_deck(10, 7)), list(deck)[:10])
+
+    def test_games_own_their_random_streams(self):
+        master = SeedSequence(2024)
+        first, second = master.spawn(2)
+        self.assertEqual(master.spawn(1), [master.child(2)])
+        deck = GameState(random_seed=first).referee_deck
+        random.seed(1)
+        GameState(random_seed=second)
+        self.assertEqual(GameState(random_seed=master.child(0)).referee_deck, deck)
+        self.assertNotEqual(GameState(random_seed=second).referee_deck, deck)
+        self.assertNotEqual(SeedSequence(2024, (0, 0)).generate_state(), first.generate_state())
+        self.assertEqual(GameState(random_seed=5).referee_deck, GameState().create_randomize_deck(1080, 5))
+
+    def test_snapshot_continues_the_same_stream(self):
+        state = GameState(random_seed=3)
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot.random.random(), state.random.random())
+
+
+if __name__ == '__main__':
+    unittest.main()
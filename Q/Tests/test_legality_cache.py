@@ -0,0 +1,52 @@
+import unittest
+
+from Q.Common.Board.tile_color import TileColor
+from Q.Common.Board.tile_shape import TileShape
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.pos import Pos
+from Q.Common.legality_cache import LegalityCache
+from Q.Common.map import Map
+from Q.Common.rulebook import Rulebook
+
+
+class TestLegalityCache(unittest.TestCase):
+    def setUp(self):
+        self.tile1 = Tile(TileShape.CIRCLE, TileColor.BLUE)
+        self.tile2 = Tile(TileShape.STAR, TileColor.BLUE)
+        self.tile3 = Tile(TileShape.CLOVER, TileColor.GREEN)
+        self.map = Map(config={Pos(0, 0): self.tile1, Pos(1, 0): self.tile2})
+        self.cache = LegalityCache(max_size=2)
+
+    def test_results_match_rulebook(self):
+        for tile in [self.tile1, self.tile2, self.tile3]:
+            self.assertEqual(self.cache.get_legal_positions(self.map, tile, []),
+                             Rulebook.get_legal_positions(self.map, tile, []))
+        self.assertEqual(self.cache.get_legal_hand(self.map, [self.tile3, self.tile1], []), [self.tile1])
+
+    def test_hits_and_misses(self):
+        self.cache.get_legal_positions(self.map, self.tile1, [])
+        self.cache.get_legal_positions(Map(config={Pos(1, 0): self.tile2, Pos(0, 0): self.tile1}), self.tile1, [])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_includes_line_of_placed_tiles(self):
+        self.map.add_tile_to_board(self.tile1, Pos(2, 0))
+        in_row = self.cache.get_legal_positions(self.map, self.tile1, [Pos(2, 0), Pos(1, 0)])
+        anywhere = self.cache.get_legal_positions(self.map, self.tile1, [])
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(in_row, Rulebook.get_legal_positions(self.map, self.tile1, [Pos(2, 0), Pos(1, 0)]))
+        self.assertLess(len(in_row), len(anywhere))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.get_legal_positions(self.map, self.tile1, [])
+        self.cache.get_legal_positions(self.map, self.tile2, [])
+        self.cache.get_legal_positions(self.map, self.tile1, [])
+        self.cache.get_legal_positions(self.map, self.tile3, [])
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get_legal_positions(self.map, self.tile1, [])
+        self.assertEqual(self.cache.hits, 2)
+        self.cache.get_legal_positions(self.map, self.tile2, [])
+        self.assertEqual(self.cache.misses, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
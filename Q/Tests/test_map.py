@@ -0,0 +1,297 @@
+import pickle
+import unittest
+from copy import deepcopy
+
+from Q.Common.Board.tile_color import TileColor
+from Q.Common.Board.tile_shape import TileShape
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.segment import Axis
+from Q.Common.Board.tile_grid import TileGrid
+from Q.Common.array_map import ArrayMap
+from Q.Common.map import Map
+from Q.Common.rulebook import Rulebook
+from Q.Common.score_breakdown import ScoreBreakdown
+from Q.Util.Configurations.score_config import ScoreConfig
+from Q.Util.pos_funcs import PosFuncs
+
+
+class TestMap(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tile1 = Tile(TileShape.CIRCLE, TileColor.BLUE)
+        self.tile2 = Tile(TileShape.CLOVER, TileColor.BLUE)
+        self.tile3 = Tile(TileShape.CLOVER, TileColor.GREEN)
+        self.tile4 = Tile(TileShape.STAR, TileColor.GREEN)
+
+        self.config = {
+            Pos(0, 0): self.tile1,
+            Pos(0, 1): self.tile2,
+            Pos(0, 2): self.tile3,
+            Pos(1, 1): self.tile2,
+            Pos(1, 2): self.tile4
+        }
+        self.dict_map = Map(config=dict(self.config))
+        self.array_map = ArrayMap(config=dict(self.config))
+
+    def test_tile_code_round_trip(self):
+        codes = [Tile(shape, color).code() for shape in TileShape for color in TileColor]
+        self.assertEqual(codes, list(range(36)))
+        for code in codes:
+            self.assertEqual(Tile.from_code(code).code(), code)
+
+    def test_pos_and_tile_are_interned(self):
+        self.assertIs(Pos(3, -4), Pos(3, -4))
+        self.assertEqual(Pos(500, 0), Pos(500, 0))
+        self.assertEqual(hash(Pos(500, 0)), hash((500, 0)))
+        self.assertIs(Tile(TileShape.STAR, TileColor.GREEN), self.tile4)
+        self.assertIs(deepcopy(self.config)[Pos(1, 2)], self.tile4)
+        self.assertIs(pickle.loads(pickle.dumps(Pos(1, 2))), Pos(1, 2))
+        with self.assertRaises(AttributeError):
+            self.tile1.color = TileColor.RED
+        with self.assertRaises(AttributeError):
+            Pos(0, 0).x = 1
+
+    def test_tile_grid_grows_in_every_direction(self):
+        grid = TileGrid()
+        far_positions = [Pos(-40, 3), Pos(55, -2), Pos(0, -70), Pos(9, 81)]
+        for pos in far_positions:
+            grid[pos] = self.tile4
+        self.assertEqual(len(grid), 4)
+        self.assertEqual(set(grid), set(far_positions))
+        self.assertIsNone(grid.get(Pos(0, 0)))
+        del grid[Pos(55, -2)]
+        self.assertNotIn(Pos(55, -2), grid)
+        self.assertEqual(len(grid), 3)
+
+    def test_array_map_tiles(self):
+        self.assertEqual(dict(self.array_map.tiles.items()), self.config)
+
+    def test_array_map_neighbors(self):
+        for pos in [Pos(0, 0), Pos(0, 1), Pos(1, 0), Pos(-1, 2)]:
+            self.assertEqual(self.array_map.get_neighbors(pos), self.dict_map.get_neighbors(pos))
+            self.assertEqual(self.array_map.get_number_of_tile_neighbors(pos),
+                             self.dict_map.get_number_of_tile_neighbors(pos))
+
+    def test_array_map_contiguous(self):
+        for pos in self.config:
+            self.assertEqual(self.array_map.get_contiguous_row(pos), self.dict_map.get_contiguous_row(pos))
+            self.assertEqual(self.array_map.get_contiguous_col(pos), self.dict_map.get_contiguous_col(pos))
+            self.assertEqual(list(self.array_map.get_contiguous_col(pos)), list(self.dict_map.get_contiguous_col(pos)))
+            self.assertEqual(self.array_map.get_contiguous(PosFuncs.above, pos),
+                             self.dict_map.get_contiguous(PosFuncs.above, pos))
+
+    def test_array_map_legal_positions(self):
+        for tile in [self.tile1, self.tile2, self.tile3, self.tile4]:
+            self.assertEqual(Rulebook.get_legal_positions(self.array_map, tile, []),
+                             Rulebook.get_legal_positions(self.dict_map, tile, []))
+
+    def test_frontier(self):
+        expected = {Pos(0, -1), Pos(-1, 0), Pos(1, 0), Pos(-1, 1), Pos(2, 1), Pos(-1, 2), Pos(2, 2),
+                    Pos(0, 3), Pos(1, 3)}
+        self.assertEqual(set(self.dict_map.frontier), expected)
+        self.assertEqual(set(self.array_map.frontier), expected)
+
+    def test_frontier_is_updated_on_placement(self):
+        self.dict_map.add_tile_to_board(self.tile1, Pos(1, 0))
+        self.assertNotIn(Pos(1, 0), self.dict_map.frontier)
+        self.assertIn(Pos(2, 0), self.dict_map.frontier)
+        self.assertEqual(self.dict_map.frontier, Map(config=dict(self.dict_map.tiles)).frontier)
+
+    def test_slot_constraint(self):
+        # Pos(1, 0) has tile1 to its left and tile2 above it
+        constraint = self.dict_map.frontier[Pos(1, 0)]
+        self.assertEqual(constraint.row_shapes, {TileShape.CIRCLE})
+        self.assertEqual(constraint.row_colors, {TileColor.BLUE})
+        self.assertEqual(constraint.col_shapes, {TileShape.CLOVER})
+        self.assertEqual(constraint.col_colors, {TileColor.BLUE})
+        self.assertTrue(constraint.accepts(Tile(TileShape.STAR, TileColor.BLUE)))
+        self.assertFalse(constraint.accepts(Tile(TileShape.CIRCLE, TileColor.RED)))
+
+    def test_candidate_slots(self):
+        for code in range(36):
+            tile = Tile.from_code(code)
+            expected = {pos for pos, constraint in self.dict_map.frontier.items() if constraint.accepts(tile)}
+            self.assertEqual(self.dict_map.get_candidate_slots(tile), expected)
+            self.assertEqual(self.array_map.get_candidate_slots(tile), expected)
+
+    def test_candidate_slots_are_updated_on_placement(self):
+        star = Tile(TileShape.STAR, TileColor.BLUE)
+        self.assertIn(Pos(1, 0), self.dict_map.get_candidate_slots(star))
+        self.dict_map.add_tile_to_board(star, Pos(1, 0))
+        self.assertNotIn(Pos(1, 0), self.dict_map.get_candidate_slots(star))
+        self.assertNotIn(Pos(2, 0), self.dict_map.get_candidate_slots(self.tile3))
+        self.assertIn(Pos(2, 0), self.dict_map.get_candidate_slots(self.tile4))
+
+    def test_segments(self):
+        row = self.dict_map.get_row_segment(Pos(1, 1))
+        self.assertEqual((row.axis, row.line, row.start, row.end), (Axis.ROW, 1, 0, 1))
+        self.assertEqual(row.shape_counts, (0, 0, 0, 0, 2, 0))
+        self.assertEqual(row.num_of_colors(), 1)
+        col = self.array_map.get_col_segment(Pos(0, 1))
+        self.assertEqual((col.axis, col.line, col.start, col.end), (Axis.COL, 0, 0, 2))
+        self.assertEqual(col.num_of_shapes(), 2)
+        self.assertEqual(col.num_of_colors(), 2)
+        self.assertIsNone(self.dict_map.get_row_segment(Pos(5, 5)))
+
+    def test_segments_merge_on_placement(self):
+        self.dict_map.add_tile_to_board(self.tile1, Pos(0, -2))
+        self.dict_map.add_tile_to_board(self.tile1, Pos(0, -1))
+        col = self.dict_map.get_col_segment(Pos(0, -2))
+        self.assertEqual((col.start, col.end), (-2, 2))
+        self.assertIs(col, self.dict_map.get_col_segment(Pos(0, 2)))
+        self.assertEqual(col.color_counts, (0, 1, 4, 0, 0, 0))
+        self.assertEqual(list(self.dict_map.get_contiguous_col(Pos(0, 0))),
+                         list(Map(config=dict(self.dict_map.tiles)).get_contiguous_col(Pos(0, 0))))
+
+    def test_fork_is_independent(self):
+        for board in [self.dict_map, self.array_map]:
+            forked = board.fork()
+            forked.add_tile_to_board(self.tile1, Pos(1, 0))
+            self.assertNotIn(Pos(1, 0), board.tiles)
+            self.assertIn(Pos(1, 0), board.frontier)
+            self.assertIn(Pos(1, 0), board.get_candidate_slots(self.tile1))
+            self.assertNotIn(Pos(1, 0), forked.get_candidate_slots(self.tile1))
+            self.assertEqual(forked.frontier, type(board)(config=dict(forked.tiles.items())).frontier)
+            board.add_tile_to_board(self.tile4, Pos(2, 1))
+            self.assertNotIn(Pos(2, 1), forked.tiles)
+            self.assertEqual(len(forked.get_row_segment(Pos(1, 1))), 2)
+
+    def test_write_after_dropped_fork_does_not_copy(self):
+        for board in [self.dict_map, self.array_map]:
+            forked = board.fork()
+            del forked
+            structures = [board.tiles, board.frontier, board.slots_by_code, board.segments, board.row_segment_ids,
+                          board.col_segment_ids, *board.slots_by_code]
+            board.add_tile_to_board(self.tile1, Pos(1, 0))
+            self.assertIn(Pos(1, 0), board.tiles)
+            self.assertTrue(all(after is before for after, before in zip(
+                [board.tiles, board.frontier, board.slots_by_code, board.segments, board.row_segment_ids,
+                 board.col_segment_ids, *board.slots_by_code], structures)))
+
+    def test_snapshot_is_frozen(self):
+        snapshot = self.dict_map.snapshot()
+        self.dict_map.add_tile_to_board(self.tile1, Pos(1, 0))
+        self.assertNotIn(Pos(1, 0), snapshot.tiles)
+        self.assertEqual(len(snapshot.get_col_segment(Pos(1, 1))), 2)
+        with self.assertRaises(Exception):
+            snapshot.add_tile_to_board(self.tile1, Pos(1, 0))
+        self.assertIn(Pos(1, 0), snapshot.fork().frontier)
+
+    def test_rollback_restores_map(self):
+        for board in [self.dict_map, self.array_map]:
+            frontier = dict(board.frontier)
+            slots = [set(slots) for slots in board.slots_by_code]
+            board.begin()
+            board.apply({Pos(1, 0): self.tile1, Pos(2, 0): self.tile2})
+            board.begin()
+            board.add_tile_to_board(self.tile4, Pos(2, 1))
+            self.assertEqual(len(board.get_row_segment(Pos(0, 1))), 3)
+            board.rollback()
+            self.assertNotIn(Pos(2, 1), board.tiles)
+            self.assertEqual(len(board.get_col_segment(Pos(1, 0))), 3)
+            board.rollback()
+            self.assertEqual(dict(board.tiles.items()), self.config)
+            self.assertEqual(board.frontier, frontier)
+            self.assertEqual(board.slots_by_code, slots)
+            self.assertEqual(len(board.get_col_segment(Pos(1, 1))), 2)
+
+    def test_commit_keeps_changes(self):
+        self.dict_map.begin()
+        self.dict_map.add_tile_to_board(self.tile1, Pos(1, 0))
+        self.dict_map.commit()
+        self.assertIn(Pos(1, 0), self.dict_map.tiles)
+        self.assertEqual(self.dict_map.frontier, Map(config=dict(self.dict_map.tiles)).frontier)
+
+    def test_valid_placements_leaves_map_unchanged(self):
+        placements = {Pos(1, 0): self.tile1, Pos(2, 0): self.tile2}
+        self.assertTrue(Rulebook.valid_placements(self.dict_map, placements))
+        self.assertFalse(Rulebook.valid_placements(self.dict_map, {Pos(1, 0): self.tile3}))
+        self.assertEqual(dict(self.dict_map.tiles), self.config)
+        self.assertEqual(self.dict_map.frontier, Map(config=dict(self.config)).frontier)
+
+    def test_zobrist_hash(self):
+        reordered = Map(config=dict(reversed(list(self.config.items()))))
+        self.assertEqual(self.dict_map.zobrist_hash(), reordered.zobrist_hash())
+        self.assertEqual(self.dict_map.zobrist_hash(), self.array_map.zobrist_hash())
+        self.assertNotEqual(Map(config={Pos(0, 0): self.tile1}).zobrist_hash(),
+                            Map(config={Pos(0, 0): self.tile2}).zobrist_hash())
+        initial = self.dict_map.zobrist_hash()
+        self.dict_map.begin()
+        self.dict_map.add_tile_to_board(self.tile1, Pos(1, 0))
+        placed = self.dict_map.zobrist_hash()
+        self.assertNotEqual(placed, initial)
+        self.assertEqual(placed, Map(config=dict(self.dict_map.tiles)).zobrist_hash())
+        self.dict_map.rollback()
+        self.assertEqual(self.dict_map.zobrist_hash(), initial)
+
+    def test_to_bytes_round_trip(self):
+        for board in [self.dict_map, self.array_map]:
+            data = board.to_bytes()
+            self.assertEqual(len(data), 5 * len(self.config))
+            decoded = type(board).from_bytes(data)
+            self.assertIsInstance(decoded, type(board))
+            self.assertEqual(dict(decoded.tiles), dict(board.tiles))
+            self.assertEqual(decoded.frontier, board.frontier)
+            self.assertEqual(decoded.zobrist_hash(), board.zobrist_hash())
+
+    def test_legal_moves(self):
+        hand = [self.tile4, self.tile1, Tile(TileShape.DIAMOND, TileColor.RED), self.tile1]
+        for board in [self.dict_map, self.array_map]:
+            for placed in [[], [Pos(1, 0)], [Pos(1, 0), Pos(2, 0)]]:
+                expected = {}
+                for tile in [self.tile4, self.tile1]:
+                    for pos in Rulebook.get_legal_positions(board, tile, placed):
+                        expected.setdefault(pos, []).append(tile)
+                self.assertEqual(Rulebook.get_legal_moves(board, hand, placed), expected)
+
+    def test_valid_placements_checks_tiles_in_order(self):
+        # Pos(2, 0) only touches the map through Pos(1, 0), so it must come after it
+        self.assertTrue(Rulebook.valid_placements(self.dict_map, {Pos(1, 0): self.tile1, Pos(2, 0): self.tile2}))
+        self.assertFalse(Rulebook.valid_placements(self.dict_map, {Pos(2, 0): self.tile2, Pos(1, 0): self.tile1}))
+        self.assertFalse(Rulebook.valid_placements(self.dict_map, {Pos(1, 0): self.tile1, Pos(2, 1): self.tile4}))
+        self.assertFalse(Rulebook.valid_placements(self.dict_map, {Pos(0, 0): self.tile1}))
+        self.assertFalse(Rulebook.valid_placements(self.dict_map, {Pos(1, 0): self.tile1, Pos(2, 0): self.tile3}))
+        self.assertTrue(Rulebook.valid_placements(self.dict_map, {}))
+
+    def test_score_turn_breakdown(self):
+        shapes = list(TileShape)
+        config = {Pos(x, 0): Tile(shapes[x], TileColor.RED) for x in range(5)}
+        board = Map(config=config)
+        placements = {Pos(5, 0): Tile(shapes[5], TileColor.RED), Pos(5, 1): Tile(shapes[5], TileColor.BLUE)}
+        board.apply(placements)
+        score_config = ScoreConfig(final_bonus=3, q_bonus=7)
+        breakdown = Rulebook.score_turn_breakdown(placements, board, [], end_game=True, score_config=score_config)
+        self.assertEqual(breakdown, ScoreBreakdown(placement=2, sequence=8, q_bonus=7, end_bonus=3))
+        self.assertEqual(Rulebook.score_turn(placements, board, [self.tile1], True, score_config), 17)
+
+    def test_score_candidates(self):
+        candidates = [{Pos(1, 0): self.tile1}, {Pos(1, 0): self.tile1, Pos(2, 0): self.tile2},
+                      {Pos(-1, 0): self.tile1}, {Pos(0, -1): self.tile1, Pos(0, -2): self.tile2}]
+        hand = [self.tile1, self.tile2]
+        breakdowns = Rulebook.score_candidates(self.dict_map, candidates, hand)
+        self.assertEqual(dict(self.dict_map.tiles), self.config)
+        for candidate, breakdown in zip(candidates, breakdowns):
+            board = Map(config=dict(self.config))
+            board.apply(candidate)
+            remaining = [tile for tile in hand if tile not in candidate.values()]
+            self.assertEqual(breakdown, Rulebook.score_turn_breakdown(candidate, board, remaining, not remaining))
+
+    def test_generate_placements(self):
+        hand = [self.tile1, self.tile1, self.tile2]
+        placements = list(Rulebook.generate_placements(self.dict_map, hand))
+        self.assertEqual(dict(self.dict_map.tiles), self.config)
+        self.assertIn({Pos(1, 0): self.tile1, Pos(2, 0): self.tile1, Pos(3, 0): self.tile2}, placements)
+        keys = [frozenset(placement.items()) for placement in placements]
+        self.assertEqual(len(keys), len(set(keys)))
+        for placement in placements:
+            self.assertTrue(Rulebook.valid_placements(self.dict_map, placement))
+        singles = {(pos, tile) for placement in placements if len(placement) == 1 for pos, tile in placement.items()}
+        expected = {(pos, tile) for tile in [self.tile1, self.tile2]
+                    for pos in Rulebook.get_legal_positions(self.dict_map, tile, [])}
+        self.assertEqual(singles, expected)
+        self.assertTrue(all(len(placement) == 1
+                            for placement in Rulebook.generate_placements(self.dict_map, hand, max_tiles=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
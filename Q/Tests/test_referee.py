@@ -1,3 +1,4 @@
+import time
 import unittest
 
 from Q.Common.Board.tile_color import TileColor
@@ -13,6 +14,20 @@ from Q.Player.Strategy.ldasg import LDasg
 from Q.Referee.pair_results import PairResults
 from Q.Referee.referee import Referee
 from Q.Referee.referee_data import RefereeData
+from Q.Util.Configurations.call_mode import CallMode
+from Q.Util.Configurations.referee_config import RefereeConfig
+
+
+class SlowPlayer(Player):
+    def win(self, w: bool):
+        time.sleep(0.3)
+        return w
+
+
+class SlowSetupPlayer(Player):
+    def setup(self, pub_data, tiles):
+        time.sleep(0.5)
+        super().setup(pub_data, tiles)
 
 
 class TestReferee(unittest.TestCase):
@@ -110,6 +125,14 @@ class TestReferee(unittest.TestCase):
         referee.signup_players(ref_data)
         self.assertEqual(len(self.gs.players), 4)
 
+    def test_signup_ejects_a_player_whose_setup_times_out(self):
+        players = [SlowSetupPlayer(strategy=Dag(), name="a", hand=[]), Player(strategy=Dag(), name="b", hand=[])]
+        game_state = GameState(given_map=Map(), player_game_states=[], random_seed=5)
+        game_state.referee_deck = game_state.referee_deck[:30]
+        results = Referee.main(players, RefereeConfig(state0=game_state, per_turn=0.1))
+        self.assertEqual(results.misbehaved, ["a"])
+        self.assertEqual(results.winners, {"b"})
+
     def test_game_with_one_player(self):
         """
         Tests the game with one player added
@@ -125,6 +148,45 @@ class TestReferee(unittest.TestCase):
         pair_results = referee.start_from_state(ref_data)
         self.assertEqual(pair_results, PairResults(winners={'bob'}, misbehaved=[]))
 
+    def test_queue_rotates_and_ejects(self):
+        players = [Player(strategy=Dag(), name=name) for name in ["a", "b", "c"]]
+        ref_data = RefereeData(player_queue=players, game_state=GameState(tiles=list(self.tiles)), misbehaved=[])
+        current = ref_data.player_queue.popleft()
+        Referee.eject_player(ref_data, current)
+        self.assertEqual([player.name() for player in ref_data.player_queue], ["b", "c"])
+        self.assertEqual(ref_data.misbehaved, [current])
+
+        players[2].hand = [self.tile1]
+        Referee.remove_current_player(ref_data, players[2])
+        self.assertEqual(list(ref_data.player_queue), [players[1]])
+        self.assertEqual(ref_data.game_state.referee_deck[-1], self.tile1)
+
+    def test_call_modes_play_the_same_game(self):
+        outcomes = []
+        for call_mode in CallMode:
+            players = [Player(strategy=Dag(), name="dag", hand=[]), Player(strategy=LDasg(), name="ldasg", hand=[])]
+            game_state = GameState(given_map=Map(), player_game_states=[], random_seed=5)
+            game_state.referee_deck = game_state.referee_deck[:60]
+            config = RefereeConfig(state0=game_state, call_mode=call_mode, trusted={"dag", "ldasg"})
+            results = Referee.main(players, config)
+            outcomes.append((results, game_state.get_scores()))
+        self.assertEqual(outcomes[1:], outcomes[:1] * 2)
+
+    def test_only_trusted_players_skip_the_timeout_thread(self):
+        player = SlowPlayer(name="slow", hand=[])
+        for call_mode in CallMode:
+            for trusted in [set(), {"slow"}]:
+                ref_data = RefereeData(player_queue=[player], game_state=GameState(tiles=list(self.tiles)),
+                                       misbehaved=[], config=RefereeConfig(per_turn=0.1, call_mode=call_mode,
+                                                                           trusted=trusted))
+                start = time.perf_counter()
+                with self.assertRaises(TimeoutError):
+                    Referee.run_method_with_time_limit(ref_data, player.win, args=[True])
+                waited = time.perf_counter() - start
+                self.assertEqual(waited >= 0.3, call_mode is CallMode.DIRECT and bool(trusted))
+                ref_data.config.per_turn = 1
+                self.assertTrue(Referee.run_method_with_time_limit(ref_data, player.win, args=[True]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,48 @@
+import io
+import json
+import unittest
+
+from Q.Common.seed_sequence import SeedSequence
+from Q.Sim.game_spec import GameSpec
+from Q.Sim.simulator import Simulator
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        self.specs = list(GameSpec.batch(["dag", "ldasg", "dag"], 4, master_seed=11, tiles=90))
+
+    @staticmethod
+    def outcomes(results):
+        return sorted((result.index, result.winners, result.misbehaved, result.scores, result.turns)
+                      for result in results)
+
+    def test_workers_replay_the_games_played_in_process(self):
+        in_process = self.outcomes(Simulator(workers=1).run(self.specs))
+        self.assertEqual([index for index, *_ in in_process], [0, 1, 2, 3])
+        self.assertTrue(all(turns > 0 for *_, turns in in_process))
+        self.assertEqual(self.outcomes(Simulator(workers=2).run(self.specs)), in_process)
+
+    def test_a_game_is_replayed_from_its_seed(self):
+        spec = GameSpec(["dag", "ldasg", "dag"], SeedSequence(11).child(2), tiles=90)
+        result = Simulator.play((2, spec))
+        self.assertEqual(self.outcomes([result]), self.outcomes([Simulator.play((2, self.specs[2]))]))
+        self.assertEqual(result.seed, [11, 2])
+
+    def test_searches_fit_the_time_limit_of_the_spec(self):
+        spec = next(GameSpec.batch(["mcts", "expectimax", "dag"], 1, master_seed=3, per_turn=0.4, tiles=40))
+        result = Simulator.play((0, spec))
+        self.assertNotIn("player0", result.misbehaved)
+        self.assertNotIn("player1", result.misbehaved)
+        self.assertGreater(result.scores["player0"], 0)
+        self.assertGreater(result.scores["player1"], 0)
+
+    def test_results_are_written_as_json_lines(self):
+        file = io.StringIO()
+        self.assertEqual(Simulator.write_jsonl(Simulator(workers=1).run(self.specs[:2]), file), 2)
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual([line["index"] for line in lines], [0, 1])
+        self.assertEqual(set(lines[0]["scores"]), {"player0", "player1", "player2"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+
+from Q.Common.Board.tile import Tile
+from Q.Common.Board.pos import Pos
+from Q.Common.map import Map
+from Q.Common.player_game_state import PlayerGameState
+from Q.Common.public_player_data import PublicPlayerData
+from Q.Common.rulebook import Rulebook
+from Q.Player.Strategy.dag import Dag
+from Q.Player.Strategy.ldasg import LDasg
+from Q.Player.Strategy.mcts import Mcts
+from Q.Player.Strategy.expectimax import Expectimax
+from Q.Player.Strategy.transposition_table import TranspositionTable
+from Q.Player.Strategy.endgame_solver import EndgameSolver
+from Q.Player.Strategy.opening_book import OpeningBook
+from Q.Player.Strategy.prepared_strategy import PreparedStrategy
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+
+
+def recursive_tile_placements(strategy, given_map, hand, placed_so_far):
+    """
+    The recursive greedy placement the strategies used to run, kept as a reference
+    """
+    tile = strategy.choose_tile(given_map, hand)
+    if tile:
+        position = strategy.choose_position(given_map, tile)
+        if position in Rulebook.get_legal_positions(given_map, tile, list(placed_so_far.keys())):
+            given_map.add_tile_to_board(tile, position)
+            placed_so_far[position] = tile
+            hand.remove(tile)
+            return recursive_tile_placements(strategy, given_map, hand, placed_so_far)
+    return placed_so_far
+
+
+def exhaustive_endgame_value(given_map, hand):
+    """
+    The most points a hand can score by placing turn after turn, searched without a transposition table
+    """
+    best = 0
+    for placement in list(Rulebook.generate_placements(given_map, hand)):
+        points = Rulebook.score_candidates(given_map, [placement], hand)[0].total()
+        rest = [tile for tile in hand if tile not in placement.values()]
+        if rest:
+            board = given_map.fork()
+            board.apply(placement)
+            points += exhaustive_endgame_value(board, rest)
+        best = max(best, points)
+    return best
+
+
+def solver_value_of(solver, given_map, hand, placement):
+    """
+    The points a placement scores plus the solver's value of the position it leaves
+    """
+    points = Rulebook.score_candidates(given_map, [placement], hand)[0].total()
+    rest = [tile for tile in hand if tile not in placement.values()]
+    board = given_map.fork()
+    board.apply(placement)
+    return points + solver.get_value(board, rest)
+
+
+class TestStrategy(unittest.TestCase):
+    def random_board(self, rnd: random.Random) -> Map:
+        board = Map(config={Pos(0, 0): Tile.from_code(rnd.randrange(36))})
+        for _ in range(rnd.randrange(30)):
+            tile = Tile.from_code(rnd.randrange(36))
+            slots = sorted(board.get_candidate_slots(tile), key=lambda pos: (pos.y, pos.x))
+            if slots:
+                board.add_tile_to_board(tile, rnd.choice(slots))
+        return board
+
+    def test_greedy_placements_match_recursive_reference(self):
+        rnd = random.Random(7)
+        for _ in range(100):
+            board = self.random_board(rnd)
+            hand = [Tile.from_code(rnd.randrange(12)) for _ in range(6)]
+            for strategy in [Dag(), LDasg()]:
+                expected = recursive_tile_placements(strategy, board.fork(), list(hand), {})
+                pub_data = PublicPlayerData(0, board.fork(), PlayerGameState("bob", list(hand), 0), [])
+                self.assertEqual(list(strategy.get_tile_placements(pub_data, list(hand)).items()),
+                                 list(expected.items()))
+
+    def test_placements_do_not_leak_between_calls(self):
+        board = Map(config={Pos(0, 0): Tile.from_code(0)})
+        pub_data = PublicPlayerData(0, board, PlayerGameState("bob", [], 0), [])
+        turn = Dag().get_turn(pub_data, [Tile.from_code(1)])
+        self.assertEqual(len(turn.placements), 1)
+        self.assertEqual(Dag().get_turn(pub_data, [Tile.from_code(35)]).placements, {})
+        self.assertEqual(dict(board.tiles), {Pos(0, 0): Tile.from_code(0)})
+
+    def test_mcts_returns_a_legal_turn(self):
+        rnd = random.Random(3)
+        for _ in range(5):
+            board = self.random_board(rnd)
+            tiles = dict(board.tiles)
+            hand = [Tile.from_code(rnd.randrange(36)) for _ in range(6)]
+            pub_data = PublicPlayerData(20, board, PlayerGameState("bob", list(hand), 0), [0, 0])
+            strategy = Mcts(time_budget=10, max_playouts=40, seed=1)
+            turn = strategy.get_turn(pub_data, list(hand))
+            self.assertIn(turn.turn_outcome, [TurnOutcome.PLACED, TurnOutcome.REPLACED])
+            if turn.turn_outcome == TurnOutcome.PLACED:
+                self.assertTrue(Rulebook.valid_placements(board, turn.placements))
+            self.assertEqual(strategy.last_stats.playouts, 40)
+            self.assertEqual(dict(board.tiles), tiles)
+
+    def test_mcts_playouts_are_reproducible_from_the_seed(self):
+        board = self.random_board(random.Random(7))
+        hand = [Tile.from_code(code) for code in [0, 1, 6, 7, 12, 13]]
+        for num_ref_tiles in [0, 20]:
+            pub_data = PublicPlayerData(num_ref_tiles, board, PlayerGameState("bob", list(hand), 0), [0])
+            searches = []
+            for _ in range(2):
+                strategy = Mcts(time_budget=10, seed=4)
+                candidates = strategy.get_candidate_turns(pub_data, hand)
+                searches.append(strategy.search(pub_data, hand, candidates, math.inf, 25))
+            self.assertEqual(searches[0], searches[1])
+
+    def test_mcts_merges_worker_searches(self):
+        board = self.random_board(random.Random(5))
+        hand = [Tile.from_code(code) for code in [0, 1, 6, 7, 12, 13]]
+        pub_data = PublicPlayerData(20, board, PlayerGameState("bob", list(hand), 0), [0])
+        strategy = Mcts(time_budget=10, max_playouts=30, seed=1, workers=2)
+        try:
+            turn = strategy.get_turn(pub_data, list(hand))
+        finally:
+            strategy.close()
+        if turn.turn_outcome == TurnOutcome.PLACED:
+            self.assertTrue(Rulebook.valid_placements(board, turn.placements))
+        self.assertEqual(strategy.last_stats.playouts, 30)
+        self.assertEqual(strategy.last_stats.workers, 2)
+
+    def test_expectimax_is_deterministic_and_legal(self):
+        rnd = random.Random(11)
+        for _ in range(5):
+            board = self.random_board(rnd)
+            tiles = dict(board.tiles)
+            hand = [Tile.from_code(rnd.randrange(36)) for _ in range(6)]
+            pub_data = PublicPlayerData(20, board, PlayerGameState("bob", list(hand), 0), [0])
+            strategy = Expectimax(beam_width=4)
+            turn = strategy.get_turn(pub_data, list(hand))
+            if turn.turn_outcome == TurnOutcome.PLACED:
+                self.assertTrue(Rulebook.valid_placements(board, turn.placements))
+            self.assertEqual(dict(board.tiles), tiles)
+            misses = strategy.table.misses
+            self.assertEqual(strategy.get_turn(pub_data, list(hand)), turn)
+            self.assertEqual(strategy.table.misses, misses)
+            self.assertEqual(Expectimax(beam_width=4).get_turn(pub_data, list(hand)), turn)
+
+    def test_expectimax_stops_at_its_time_budget(self):
+        rnd = random.Random(5)
+        board = self.random_board(rnd)
+        hand = [Tile.from_code(rnd.randrange(36)) for _ in range(6)]
+        pub_data = PublicPlayerData(20, board, PlayerGameState("bob", list(hand), 0), [0])
+        strategy = Expectimax(time_budget=0.0)
+        turn = strategy.get_turn(pub_data, list(hand))
+        self.assertEqual(strategy.last_stats.candidates, 1)
+        self.assertEqual(turn, strategy.get_candidates(pub_data, hand, 0.0)[0][0])
+
+    def test_expectimax_prefers_points_ahead_of_the_reply(self):
+        board = Map(config={Pos(0, 0): Tile.from_code(0), Pos(1, 0): Tile.from_code(6)})
+        hand = [Tile.from_code(1), Tile.from_code(12)]
+        pub_data = PublicPlayerData(20, board, PlayerGameState("bob", list(hand), 0), [0])
+        strategy = Expectimax()
+        values = []
+        for candidate, points in strategy.get_candidates(pub_data, hand):
+            board.begin()
+            board.apply(candidate.placements)
+            values.append((points - strategy.get_reply_value(board), candidate))
+            board.rollback()
+        self.assertGreater(len(values), 1)
+        best_value = max(value for value, _ in values)
+        self.assertIn(strategy.get_turn(pub_data, list(hand)),
+                      [candidate for value, candidate in values if value == best_value])
+
+    def test_transposition_table_evicts_least_recently_used(self):
+        table = TranspositionTable(max_size=2)
+        table.put(1, 1.0)
+        table.put(2, 2.0)
+        self.assertEqual(table.get(1), 1.0)
+        table.put(3, 3.0)
+        self.assertIsNone(table.get(2))
+        self.assertEqual((table.get(1), table.get(3)), (1.0, 3.0))
+        self.assertEqual((table.hits, table.misses, len(table)), (3, 1, 2))
+
+    def test_endgame_solver_matches_exhaustive_search(self):
+        rnd = random.Random(9)
+        for _ in range(5):
+            board = self.random_board(rnd)
+            hand = [Tile.from_code(rnd.randrange(36)) for _ in range(3)]
+            solver = EndgameSolver()
+            turn = solver.solve(board, list(hand))
+            expected = exhaustive_endgame_value(board, hand)
+            self.assertEqual(solver.get_value(board, hand), expected)
+            if expected:
+                self.assertTrue(Rulebook.valid_placements(board, turn.placements))
+                self.assertEqual(solver_value_of(solver, board, hand, turn.placements), expected)
+            else:
+                self.assertIsNone(turn)
+        board = Map(config={Pos(0, 0): Tile.from_code(0)})
+        self.assertIsNone(EndgameSolver(max_nodes=1).solve(board, [Tile.from_code(1), Tile.from_code(2)]))
+
+    def test_endgame_solver_applies_once_nothing_can_be_drawn(self):
+        board = Map(config={Pos(0, 0): Tile.from_code(0)})
+        hand = [Tile.from_code(1), Tile.from_code(2)]
+        pub_data = PublicPlayerData(0, board, PlayerGameState("bob", list(hand), 0), [0])
+        self.assertTrue(EndgameSolver().applies(pub_data, hand))
+        pub_data = PublicPlayerData(1, board, PlayerGameState("bob", list(hand), 0), [0])
+        self.assertFalse(EndgameSolver().applies(pub_data, hand))
+
+    def test_opening_book_is_keyed_up_to_translation(self):
+        hand = [Tile.from_code(code) for code in [1, 7, 8, 20, 3, 3]]
+        board = Map(config={Pos(0, 0): Tile.from_code(0), Pos(1, 0): Tile.from_code(6)})
+        moved = Map(config={Pos(5, -3): Tile.from_code(0), Pos(6, -3): Tile.from_code(6)})
+        book = OpeningBook()
+        book.add(board, hand, Turn(TurnOutcome.PLACED, {Pos(0, 1): Tile.from_code(1)}))
+        self.assertEqual(book.lookup(moved, list(reversed(hand))).placements, {Pos(5, -2): Tile.from_code(1)})
+        self.assertIsNone(book.lookup(moved, hand[1:]))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.json")
+            book.save(path)
+            loaded = OpeningBook.load(path)
+        self.assertEqual(loaded.lookup(board, hand), book.lookup(board, hand))
+
+    def test_prepared_strategy_plays_generated_book(self):
+        book = OpeningBook.generate(Dag(), games=2, plies=2, seed=4)
+        self.assertTrue(book.entries)
+        strategy = PreparedStrategy(LDasg(), book, EndgameSolver())
+        rnd = random.Random(4)
+        for _ in range(3):
+            board = self.random_board(rnd)
+            hand = [Tile.from_code(rnd.randrange(36)) for _ in range(6)]
+            pub_data = PublicPlayerData(0, board, PlayerGameState("bob", list(hand), 0), [0])
+            turn = strategy.get_turn(pub_data, list(hand[:3]))
+            if turn.turn_outcome == TurnOutcome.PLACED:
+                self.assertTrue(Rulebook.valid_placements(board, turn.placements))
+
+
+if __name__ == '__main__':
+    unittest.main()
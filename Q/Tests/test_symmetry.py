@@ -0,0 +1,103 @@
+import random
+import unittest
+
+from Q.Common.Board.pos import Pos
+from Q.Common.Board.symmetry import Symmetry, TRANSFORMS
+from Q.Common.Board.tile import Tile
+from Q.Common.legality_cache import LegalityCache
+from Q.Common.map import Map
+from Q.Common.rulebook import Rulebook
+from Q.Common.Turn.turn import Turn
+from Q.Common.Turn.turn_outcome import TurnOutcome
+from Q.Player.Strategy.opening_book import OpeningBook
+
+
+class TestSymmetry(unittest.TestCase):
+    def setUp(self):
+        self.rnd = random.Random(3)
+
+    def random_board(self) -> Map:
+        board = Map(config={Pos(0, 0): Tile.from_code(self.rnd.randrange(36))})
+        for _ in range(self.rnd.randrange(30)):
+            tile = Tile.from_code(self.rnd.randrange(36))
+            slots = sorted(board.get_candidate_slots(tile), key=lambda pos: (pos.y, pos.x))
+            if slots:
+                board.add_tile_to_board(tile, self.rnd.choice(slots))
+        return board
+
+    def random_symmetry(self) -> Symmetry:
+        shapes, colors = list(range(6)), list(range(6))
+        self.rnd.shuffle(shapes)
+        self.rnd.shuffle(colors)
+        return Symmetry(self.rnd.choice(TRANSFORMS), (self.rnd.randrange(-9, 9), self.rnd.randrange(-9, 9)),
+                        tuple(shapes), tuple(colors))
+
+    def test_images_share_the_canonical_key(self):
+        for _ in range(100):
+            board = self.random_board()
+            hand = [self.rnd.choice(list(board.tiles.values())) for _ in range(self.rnd.randrange(7))]
+            symmetry = self.random_symmetry()
+            image = symmetry.apply_placements(board.tiles)
+            image_hand = [symmetry.apply_tile(tile) for tile in hand]
+            self.assertEqual(Symmetry.canonicalize(board.tiles, hand, relabel=True)[0],
+                             Symmetry.canonicalize(image, image_hand, relabel=True)[0])
+            moved = Symmetry(symmetry.transform, symmetry.offset).apply_placements(board.tiles)
+            self.assertEqual(Symmetry.canonicalize(board.tiles, hand)[0], Symmetry.canonicalize(moved, hand)[0])
+
+    def test_keys_tell_different_positions_apart(self):
+        board = {Pos(0, 0): Tile.from_code(0), Pos(1, 0): Tile.from_code(1)}
+        other = {Pos(0, 0): Tile.from_code(0), Pos(1, 0): Tile.from_code(7)}
+        self.assertNotEqual(Symmetry.canonicalize(board, relabel=True)[0],
+                            Symmetry.canonicalize(other, relabel=True)[0])
+        self.assertNotEqual(Symmetry.canonicalize(board, [Tile.from_code(0)])[0],
+                            Symmetry.canonicalize(board, [Tile.from_code(1)])[0])
+        self.assertNotEqual(Symmetry.canonicalize(board)[0], Symmetry.canonicalize(board, relabel=True)[0] + 1)
+
+    def test_invert_undoes_apply(self):
+        for _ in range(20):
+            board = self.random_board()
+            _, symmetry = Symmetry.canonicalize(board.tiles, relabel=True)
+            self.assertEqual(symmetry.invert_placements(symmetry.apply_placements(board.tiles)), dict(board.tiles))
+
+    def test_legality_and_scoring_are_invariant(self):
+        for _ in range(30):
+            board = self.random_board()
+            symmetry = self.random_symmetry()
+            image = Map(config=symmetry.apply_placements(board.tiles))
+            tile = Tile.from_code(self.rnd.randrange(36))
+            positions = Rulebook.get_legal_positions(board, tile, [])
+            self.assertEqual({symmetry.apply_pos(pos) for pos in positions},
+                             Rulebook.get_legal_positions(image, symmetry.apply_tile(tile), []))
+            placements = [{pos: tile} for pos in positions]
+            self.assertEqual([score.total() for score in Rulebook.score_candidates(board, placements)],
+                             [score.total() for score in Rulebook.score_candidates(
+                                 image, [symmetry.apply_placements(placement) for placement in placements])])
+
+    def test_canonical_legality_cache_shares_entries_between_images(self):
+        cache = LegalityCache(canonical=True)
+        for _ in range(20):
+            board = self.random_board()
+            symmetry = self.random_symmetry()
+            image = Map(config=symmetry.apply_placements(board.tiles))
+            tile = Tile.from_code(self.rnd.randrange(36))
+            cache.clear()
+            self.assertEqual(cache.get_legal_positions(board, tile, []), Rulebook.get_legal_positions(board, tile, []))
+            image_tile = symmetry.apply_tile(tile)
+            self.assertEqual(cache.get_legal_positions(image, image_tile, []),
+                             Rulebook.get_legal_positions(image, image_tile, []))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_opening_book_finds_rotated_relabeled_positions(self):
+        board = Map(config={Pos(0, 0): Tile.from_code(0), Pos(1, 0): Tile.from_code(6)})
+        hand = [Tile.from_code(code) for code in [1, 7, 8]]
+        book = OpeningBook()
+        book.add(board, hand, Turn(TurnOutcome.PLACED, {Pos(0, 1): Tile.from_code(1)}))
+        symmetry = Symmetry(TRANSFORMS[1], (4, 2), (2, 0, 1, 3, 4, 5), (5, 4, 3, 2, 1, 0))
+        image = Map(config=symmetry.apply_placements(board.tiles))
+        turn = book.lookup(image, [symmetry.apply_tile(tile) for tile in hand])
+        self.assertEqual(turn.placements, symmetry.apply_placements({Pos(0, 1): Tile.from_code(1)}))
+        self.assertTrue(Rulebook.valid_placements(image, turn.placements))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class CallMode(Enum):
+    """
+    How the referee calls a player's methods
+    THREAD: in a new thread per call, abandoned if it takes longer than the time limit
+    POOL: in a thread of a pool kept for the whole game, abandoned if it takes longer than the time limit
+    DIRECT: in the referee's own thread, and the player is treated as timed out if the call took longer than the
+    time limit once it returns, so only for players that are sure to return
+    """
+    THREAD = "thread"
+    POOL = "pool"
+    DIRECT = "direct"
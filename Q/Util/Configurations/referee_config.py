@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
+from typing import Set
 
+from Q.Util.Configurations.call_mode import CallMode
 from Q.Util.Configurations.score_config import ScoreConfig
 from Q.Common.game_state import GameState
 
@@ -8,9 +10,14 @@ from Q.Common.game_state import GameState
 class RefereeConfig:
     """
     Represents the referee configuration. Alters all of these configurable variables per request.
+    call_mode: how the methods of trusted players are called, see CallMode
+    trusted: the names of the players called with call_mode, e.g. in-process strategies in simulations; every
+    other player is called in a thread of its own so that it can be timed out
     """
     state0: GameState = field(default_factory=GameState)
     quiet: bool = True
     per_turn: int = 6
     observe: bool = False
     config_s: ScoreConfig = field(default_factory=ScoreConfig)
+    call_mode: CallMode = CallMode.THREAD
+    trusted: Set[str] = field(default_factory=set)
@@ -15,6 +15,7 @@ setup(
               'Q.Tests',
               'Q.Util',
               'Q.Server',
+              'Q.Sim',
               'Q.Client',
               'Q.Client.RefereeMethods',
               'Q.Util.Configurations'